@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+# HTTP/2 传输基准：本地起一个支持 h2 的 TLS 替身服务器（hypercorn），多个源挂在同一主机上，
+# 与正式抓取一样经 dispatch_by_host + AdaptiveHostThrottle 调用 fetch_feed_payload，
+# 分别用 requests 会话（HTTP/1.1，每线程连接池）与 Http2Transport 抓取，对比耗时与连接数。
+# 注意：按主机限速（并发上限 HOST_MAX_CONCURRENCY、最小间隔 HOST_MIN_INTERVAL）对两种传输相同，
+# 单一主机的吞吐由限速决定，HTTP/2 的收益主要是连接与TLS握手数减少；--no-throttle 可看去掉限速后的传输上限
+# 依赖: pip install "httpx[http2]" hypercorn requests；需要 openssl 命令生成自签名证书
+# 用法: python benchmarks/bench_http2.py [--feeds 60] [--latency 0.05] [--workers 8] [--no-throttle]
+import argparse
+import asyncio
+import concurrent.futures
+import os
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sniffer_geo_pro as sniffer
+
+RSS_ITEM = ("<item><title>Carbonate diagenesis study {i}</title><link>https://example.org/a/{i}</link>"
+            "<description>pyrite oxidation in microbial mats</description></item>")
+RSS_BODY = ('<?xml version="1.0"?><rss version="2.0"><channel><title>stand-in</title>'
+            + "".join(RSS_ITEM.format(i=i) for i in range(20)) + "</channel></rss>").encode()
+
+class StandInServer:
+    """hypercorn 上的ASGI替身：每个请求按设定延迟返回同一份RSS，并按客户端端口统计连接数"""
+
+    def __init__(self, certfile, keyfile, latency):
+        self.certfile = certfile
+        self.keyfile = keyfile
+        self.latency = latency
+        self.connections = set()
+        self.versions = {}
+        self.port = None
+        self._ready = threading.Event()
+        self._loop = None
+        self._stop = None
+
+    async def app(self, scope, receive, send):
+        if scope["type"] != "http":
+            return
+        self.connections.add(scope["client"])
+        self.versions[scope["http_version"]] = self.versions.get(scope["http_version"], 0) + 1
+        await asyncio.sleep(self.latency)
+        await send({"type": "http.response.start", "status": 200,
+                    "headers": [(b"content-type", b"application/rss+xml"), (b"content-length", str(len(RSS_BODY)).encode())]})
+        await send({"type": "http.response.body", "body": RSS_BODY})
+
+    def reset(self):
+        self.connections = set()
+        self.versions = {}
+
+    def start(self):
+        threading.Thread(target=self._run, daemon=True).start()
+        self._ready.wait(timeout=10)
+
+    def _run(self):
+        from hypercorn.asyncio import serve
+        from hypercorn.config import Config
+        import socket
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            self.port = probe.getsockname()[1]
+        config = Config()
+        config.bind = [f"127.0.0.1:{self.port}"]
+        config.certfile = self.certfile
+        config.keyfile = self.keyfile
+        config.accesslog = None
+        config.errorlog = None
+        self._loop = asyncio.new_event_loop()
+        self._stop = asyncio.Event()
+        self._loop.call_later(0.5, self._ready.set)
+        self._loop.run_until_complete(serve(self.app, config, shutdown_trigger=self._stop.wait))
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+def make_certificate(directory):
+    certfile = os.path.join(directory, "cert.pem")
+    keyfile = os.path.join(directory, "key.pem")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1", "-subj", "/CN=localhost",
+                    "-addext", "subjectAltName=DNS:localhost,IP:127.0.0.1", "-keyout", keyfile, "-out", certfile],
+                   check=True, capture_output=True)
+    return certfile, keyfile
+
+class Unthrottled:
+    """不限速的派发器替身：dispatch_by_host 只受线程数限制，抓取本身也不经限速器"""
+
+    def dispatch_delay(self, url, in_flight, last_dispatch=None):
+        return 0
+
+def fetch_all(feeds, workers, throttled=True):
+    """与 fetch_and_score 相同的派发路径：按主机分队列，经限速器控制并发与间隔"""
+    rss_status = {}
+    today = time.strftime("%Y-%m-%d")
+    throttle = sniffer.AdaptiveHostThrottle() if throttled else None
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        results = sniffer.dispatch_by_host(
+            executor, lambda feed, mode: sniffer.fetch_feed_payload(feed, today, rss_status, max_retries=1, throttle=throttle),
+            feeds, lambda feed: feed["url"], throttle or Unthrottled(), workers)
+        contents = [future.result() for _, future in results]
+    elapsed = time.perf_counter() - start
+    failed = sum(content is None for content in contents)
+    return elapsed, failed
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP/2 与 requests 抓取对比")
+    parser.add_argument("--feeds", type=int, default=60, help="同一主机上的RSS源数量（限速下单主机每秒最多约 1/HOST_MIN_INTERVAL 个请求）")
+    parser.add_argument("--latency", type=float, default=0.05, help="替身服务器每个请求的响应延迟（秒）")
+    parser.add_argument("--workers", type=int, default=sniffer.FETCH_WORKERS, help="并发抓取线程数")
+    parser.add_argument("--no-throttle", action="store_true", help="另外测一组不经按主机限速的抓取")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        certfile, keyfile = make_certificate(directory)
+        server = StandInServer(certfile, keyfile, args.latency)
+        server.start()
+        feeds = [{"url": f"https://localhost:{server.port}/feed/{i}", "title": f"J{i}", "zone": ""} for i in range(args.feeds)]
+        # 抓取日志太多，只保留结果表
+        devnull = open(os.devnull, "w")
+        results = []
+        try:
+            os.environ["REQUESTS_CA_BUNDLE"] = certfile
+            modes = [(name, True) for name in ("requests", "http2")]
+            if args.no_throttle:
+                modes += [(name, False) for name in ("requests", "http2")]
+            for name, throttled in modes:
+                sniffer._HTTP2_TRANSPORT = None
+                # 每组新建线程池，线程内的 requests 会话也随之重建，各组都从冷连接开始
+                if name == "http2":
+                    sniffer._HTTP2_TRANSPORT = sniffer.Http2Transport(verify=ssl.create_default_context(cafile=certfile))
+                server.reset()
+                stdout, sys.stdout = sys.stdout, devnull
+                try:
+                    elapsed, failed = fetch_all(feeds, args.workers, throttled)
+                finally:
+                    sys.stdout = stdout
+                    if sniffer._HTTP2_TRANSPORT is not None:
+                        sniffer._HTTP2_TRANSPORT.client.close()
+                label = name if throttled else f"{name}/不限速"
+                results.append((label, elapsed, failed, len(server.connections), dict(server.versions)))
+        finally:
+            sniffer._HTTP2_TRANSPORT = None
+            server.stop()
+            devnull.close()
+
+    print(f"{args.feeds} 个源 / 同一主机 / 延迟 {args.latency}s / {args.workers} 线程")
+    print(f"按主机限速: 并发≤{sniffer.HOST_MAX_CONCURRENCY}，间隔≥{sniffer.HOST_MIN_INTERVAL}s（起始 {sniffer.HOST_INITIAL_INTERVAL}s）")
+    print(f"{'传输':<16} {'耗时(s)':>8} {'失败':>6} {'连接数':>6}  协议")
+    for name, elapsed, failed, connections, versions in results:
+        print(f"{name:<16} {elapsed:8.2f} {failed:6d} {connections:6d}  {versions}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# 推送调度基准：旧的“逐篇重建hash列表 + 全量排序”与 PushQueue（hash索引堆 + 取前K）对比
+# 用法: python benchmarks/bench_push_queue.py [--sizes 2000,10000,40000] [--legacy-max 10000]
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from sniffer_geo_pro import MAX_PUSH_PER_BATCH, PushQueue
+
+def make_articles(n, seed=0):
+    rng = random.Random(seed)
+    # 约5%重复hash，模拟同一文章在多个源或多次运行中出现
+    return [{'hash': f"h{rng.randrange(int(n * 0.95))}", 'title': f"article {i}", 'priority_score': rng.randrange(0, 300)}
+            for i in range(n)]
+
+def legacy_schedule(articles):
+    """改造前 main() 中的做法"""
+    schedule = []
+    for article in articles:
+        if article['hash'] not in [a['hash'] for a in schedule]:
+            schedule.append(article)
+    schedule = sorted(schedule, key=lambda x: x['priority_score'], reverse=True)
+    first_batch = schedule[:MAX_PUSH_PER_BATCH]
+    second_batch = schedule[MAX_PUSH_PER_BATCH:MAX_PUSH_PER_BATCH * 2]
+    return first_batch, second_batch
+
+def queue_schedule(articles):
+    push_queue = PushQueue()
+    for article in articles:
+        push_queue.push(article)
+    return push_queue.pop_top(MAX_PUSH_PER_BATCH), push_queue.pop_top(MAX_PUSH_PER_BATCH)
+
+def timed(fn, articles):
+    start = time.perf_counter()
+    result = fn(articles)
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="PushQueue 调度基准")
+    parser.add_argument("--sizes", default="2000,10000,40000", help="排队文章数，逗号分隔")
+    parser.add_argument("--legacy-max", type=int, default=10000, help="旧做法是平方复杂度，超过此规模不再运行")
+    args = parser.parse_args()
+    print(f"{'文章数':>8} {'旧做法(s)':>12} {'PushQueue(s)':>14}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        articles = make_articles(n)
+        queue_time, queue_result = timed(queue_schedule, articles)
+        if n <= args.legacy_max:
+            legacy_time, legacy_result = timed(legacy_schedule, articles)
+            # 两种做法选出的文章分数必须一致
+            assert [[a['priority_score'] for a in batch] for batch in legacy_result] == \
+                   [[a['priority_score'] for a in batch] for batch in queue_result]
+            legacy = f"{legacy_time:12.3f}"
+        else:
+            legacy = f"{'跳过':>10}"
+        print(f"{n:>10} {legacy} {queue_time:14.4f}")
+
+if __name__ == "__main__":
+    main()
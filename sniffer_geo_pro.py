@@ -1,6 +1,6 @@
 # -*- coding: utf-8 -*-
-import feedparser
-import requests
+# requests / feedparser / bs4 在用到的函数内按需导入：--status 等本地操作无需加载网络与解析依赖，
+# BeautifulSoup 只在每周的RSS源发现中才会用到；sqlite3/gzip/pickle/subprocess 同样只在对应功能里导入
 import datetime
 import re
 import json
@@ -9,16 +9,597 @@ import hashlib
 import time
 import csv
 import signal
-from collections import Counter
+import argparse
+import heapq
+import bisect
+import itertools
+import threading
+import queue
+import concurrent.futures
+import email.utils
+import functools
+import contextlib
+import atexit
+import shutil
+import sys
+from collections import Counter, deque
 from urllib.parse import urljoin, urlparse
-from bs4 import BeautifulSoup
 import random
+import ipaddress
+
+# ==================== 检查点与原子写入 ====================
+
+def atomic_write(path, writer, newline=None):
+    """先写临时文件再原子替换，写到一半被中断也不会损坏原文件"""
+    temp_file = f"{path}.tmp"
+    with open(temp_file, 'w', encoding='utf-8', newline=newline) as f:
+        writer(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+def atomic_write_json(path, data, indent=2):
+    atomic_write(path, lambda f: json.dump(data, f, ensure_ascii=False, indent=indent))
+
+class CheckpointJournal:
+    """追加写入的检查点日志（JSONL）：每条记录是一次增量，写入代价与增量成正比"""
+
+    def __init__(self, path):
+        self.path = path
+        self._torn_tail = False
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def read(self):
+        records = []
+        if not self.exists():
+            return records
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    self._torn_tail = not line.endswith("\n")
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        # 写入中断（崩溃或SIGALRM）留下的残缺行直接跳过
+                        continue
+        except Exception as e:
+            print(f"[ERROR] 读取检查点失败 {self.path}: {e}")
+        return records
+
+    def append(self, *records):
+        if not records:
+            return
+        with open(self.path, 'a', encoding='utf-8') as f:
+            if self._torn_tail:
+                f.write("\n")
+                self._torn_tail = False
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def rewrite(self, records):
+        """压缩：用给定记录原子替换整个日志"""
+        def write_records(f):
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False, separators=(',', ':')) + "\n")
+        atomic_write(self.path, write_records)
+        self._torn_tail = False
+
+    def clear(self):
+        if self.exists():
+            os.remove(self.path)
+        self._torn_tail = False
+
+# ==================== 性能剖析 ====================
+
+PROFILE_STAGES = ("discovery", "fetch", "parse", "phrases", "score", "schedule", "push")
+PROFILE_TOP_N = 40            # 报告中列出的函数/分配位置数量
+TRACEMALLOC_FRAMES = 1        # 每次分配记录的调用栈深度，越深越慢
+# 剖析器自身的分配不计入报告
+_PROFILER_OWN_FILES = ("cProfile.py", "pstats.py", "tracemalloc.py")
+
+class StageProfiler:
+    """按阶段的cProfile与tracemalloc剖析；未开启时 stage() 只返回空上下文"""
+
+    def __init__(self):
+        self.cpu = False
+        self.memory = False
+        self.stages = set()
+        self.output_dir = None
+        self._stats = {}
+        self._times = {}
+        self._memory_reports = []
+        self._lock = threading.Lock()
+
+    def configure(self, output_dir, cpu=False, memory=False, stages=None, memory_frames=TRACEMALLOC_FRAMES):
+        self.cpu = cpu
+        self.memory = memory
+        self.stages = set(stages or PROFILE_STAGES)
+        self.output_dir = output_dir
+        if memory:
+            import tracemalloc
+            tracemalloc.start(memory_frames)
+        atexit.register(self.write_reports)
+
+    def stage(self, name):
+        if not (self.cpu or self.memory) or name not in self.stages:
+            return contextlib.nullcontext()
+        return self._profile(name)
+
+    @contextlib.contextmanager
+    def _profile(self, name):
+        import cProfile
+        profiler = None
+        if self.cpu:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # 新版Python同一时刻只允许一个剖析器，并发线程中的同名阶段跳过
+                profiler = None
+        # tracemalloc是进程级的，只在主线程的阶段前后做快照对比；线程池中的阶段由 memory_snapshot() 整体记录
+        snapshot_before = None
+        if self.memory and threading.current_thread() is threading.main_thread():
+            snapshot_before = self._memory_begin()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiler is not None:
+                profiler.disable()
+            with self._lock:
+                total, calls = self._times.get(name, (0.0, 0))
+                self._times[name] = (total + elapsed, calls + 1)
+                if profiler is not None:
+                    profiler.create_stats()
+                    if name in self._stats:
+                        self._stats[name].add(profiler)
+                    else:
+                        import pstats
+                        self._stats[name] = pstats.Stats(profiler)
+            if snapshot_before is not None:
+                self._memory_end(name, snapshot_before)
+
+    def _memory_begin(self):
+        import tracemalloc
+        tracemalloc.reset_peak()
+        return tracemalloc.take_snapshot()
+
+    def _memory_end(self, name, snapshot_before):
+        import tracemalloc
+        _, peak = tracemalloc.get_traced_memory()
+        # 不对整个快照做通配过滤（trace多时极慢），只从对比结果中剔除剖析器自身的分配
+        diff = tracemalloc.take_snapshot().compare_to(snapshot_before, 'lineno')
+        diff = [stat for stat in diff
+                if not os.path.basename(stat.traceback[0].filename).endswith(_PROFILER_OWN_FILES)][:PROFILE_TOP_N]
+        self._memory_reports.append((name, peak, diff))
+
+    @contextlib.contextmanager
+    def memory_snapshot(self, name, covers):
+        """在主线程对一段并发处理整体做快照对比；covers 中任一阶段被选中时记录"""
+        if not self.memory or not self.stages & set(covers):
+            yield
+            return
+        snapshot_before = self._memory_begin()
+        try:
+            yield
+        finally:
+            self._memory_end(name, snapshot_before)
+
+    def write_reports(self):
+        if not (self.cpu or self.memory) or not self._times:
+            return
+        try:
+            os.makedirs(self.output_dir, exist_ok=True)
+            lines = [f"{name}\t{total:.3f}s\t{calls}次" for name, (total, calls) in sorted(self._times.items(), key=lambda item: -item[1][0])]
+            atomic_write(os.path.join(self.output_dir, "stages.txt"), lambda f: f.write("阶段\t累计耗时（并发线程中的阶段为各次之和）\t次数\n" + "\n".join(lines) + "\n"))
+            for name, stats in self._stats.items():
+                stats.dump_stats(os.path.join(self.output_dir, f"{name}.prof"))
+                with open(os.path.join(self.output_dir, f"{name}.txt"), 'w', encoding='utf-8') as f:
+                    stats.stream = f
+                    stats.sort_stats('cumulative').print_stats(PROFILE_TOP_N)
+            for i, (name, peak, diff) in enumerate(self._memory_reports, 1):
+                with open(os.path.join(self.output_dir, f"{i:02d}_{name}_memory.txt"), 'w', encoding='utf-8') as f:
+                    f.write(f"阶段: {name}  峰值: {peak / 1024 / 1024:.1f} MiB\n")
+                    for stat in diff:
+                        f.write(f"{stat}\n")
+            print(f"[INFO] 🔬 剖析报告已写入 {self.output_dir}")
+        except Exception as e:
+            print(f"[WARN] 写入剖析报告失败: {e}")
+
+STAGE_PROFILER = StageProfiler()
+
+def profile_stage(name):
+    return STAGE_PROFILER.stage(name)
+
+# ==================== 按主机自适应限速 ====================
+
+HOST_INITIAL_INTERVAL = 1.0   # 同一主机两次请求之间的初始间隔（秒）
+HOST_MIN_INTERVAL = 0.2
+HOST_MAX_INTERVAL = 30.0
+HOST_MAX_CONCURRENCY = 4
+HOST_RATE_STEP = 0.2          # 每次成功后请求速率增加的量（次/秒）
+HOST_SLOW_LATENCY = 8.0       # 响应慢于此值视为主机吃力
+RETRY_AFTER_CAP = 300
+RETRY_MAX_HOST_WAIT = 5.0     # 失败后主机要求的等待（加倍后的间隔或Retry-After）超过此值时不再重试该源
+
+def parse_retry_after(value):
+    """Retry-After 可以是秒数或HTTP日期，统一换算为秒"""
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0), RETRY_AFTER_CAP)
+
+class AdaptiveHostThrottle:
+    """按主机的AIMD限速：成功且快速时加性放宽并发与间隔，429/503/超时/慢响应时乘性收紧，并遵守Retry-After"""
+
+    def __init__(self):
+        self._hosts = {}
+        self._cond = threading.Condition()
+
+    def _state(self, host):
+        if host not in self._hosts:
+            self._hosts[host] = {'window': 1.0, 'active': 0, 'interval': HOST_INITIAL_INTERVAL, 'next_time': 0.0}
+        return self._hosts[host]
+
+    def acquire(self, url):
+        host = urlparse(url).netloc
+        with self._cond:
+            while True:
+                state = self._state(host)
+                now = time.monotonic()
+                if state['active'] < int(state['window']) and now >= state['next_time']:
+                    state['active'] += 1
+                    state['next_time'] = now + state['interval']
+                    return host
+                wait_time = state['next_time'] - now if state['active'] < int(state['window']) else 1.0
+                self._cond.wait(timeout=max(wait_time, 0.01))
+
+    def release(self, host, latency, status_code=None, retry_after=None):
+        with self._cond:
+            state = self._state(host)
+            state['active'] -= 1
+            overloaded = status_code in (429, 503) or status_code is None or latency > HOST_SLOW_LATENCY
+            if overloaded:
+                state['window'] = max(1.0, state['window'] / 2)
+                state['interval'] = min(HOST_MAX_INTERVAL, state['interval'] * 2)
+            else:
+                # 4xx（除429）说明主机响应正常，只是该URL不存在，同样视为健康
+                state['window'] = min(float(HOST_MAX_CONCURRENCY), state['window'] + 1.0 / state['window'])
+                # 请求速率（1/间隔）加性增加
+                state['interval'] = max(HOST_MIN_INTERVAL, 1.0 / (1.0 / state['interval'] + HOST_RATE_STEP))
+            delay = parse_retry_after(retry_after) if status_code in (429, 503) else None
+            if delay:
+                state['next_time'] = max(state['next_time'], time.monotonic() + delay)
+            self._cond.notify_all()
+
+    def request(self, url, send):
+        """在限速下执行一次请求，send() 返回响应对象"""
+        host = self.acquire(url)
+        started = time.monotonic()
+        status_code = None
+        retry_after = None
+        try:
+            resp = send()
+            status_code = resp.status_code
+            retry_after = resp.headers.get("Retry-After")
+            return resp
+        finally:
+            self.release(host, time.monotonic() - started, status_code, retry_after)
+
+    def dispatch_delay(self, url, in_flight, last_dispatch=None):
+        """调度用：该主机已有in_flight个任务在处理时，再派发一个需等待的秒数；并发已满返回None"""
+        host = urlparse(url).netloc
+        with self._cond:
+            state = self._state(host)
+            if in_flight >= int(state['window']):
+                return None
+            ready = state['next_time']
+            if last_dispatch is not None:
+                ready = max(ready, last_dispatch + state['interval'])
+            return max(0.0, ready - time.monotonic())
+
+    def snapshot(self):
+        with self._cond:
+            return {h: (int(s['window']), round(s['interval'], 2)) for h, s in self._hosts.items()}
+
+def dispatch_by_host(executor, fn, items, url_of, throttle, max_in_flight, admit=None, blocked=None):
+    """按主机分队列派发：只把有空闲槽位的主机的下一项交给线程池，线程不会在忙碌的主机上空等；按完成顺序产出 (item, future)
+
+    admit(item) 在主线程、真正派发前调用，返回None表示跳过，否则作为第二个参数传给 fn；
+    blocked(item) 不改变状态，为True的队首项不等主机间隔直接丢弃（同样经admit计数），主机熔断后其余排队项立即清空
+    """
+    queues = {}
+    for item in items:
+        queues.setdefault(urlparse(url_of(item)).netloc, deque()).append(item)
+    in_flight = {}
+    host_active = Counter()
+    last_dispatch = {}
+
+    def drop_blocked(host):
+        queue_ = queues[host]
+        while queue_ and blocked is not None and blocked(queue_[0]):
+            item = queue_.popleft()
+            if admit is not None:
+                admit(item)
+        if not queue_:
+            del queues[host]
+            return False
+        return True
+
+    while queues or in_flight:
+        wait_time = None
+        dispatched = True
+        # 各主机轮流派发一项，直到线程池占满或没有主机可派发
+        while dispatched and queues and len(in_flight) < max_in_flight:
+            dispatched = False
+            for host in list(queues):
+                if len(in_flight) >= max_in_flight:
+                    break
+                if not drop_blocked(host):
+                    continue
+                delay = throttle.dispatch_delay(url_of(queues[host][0]), host_active[host], last_dispatch.get(host))
+                if delay is None:
+                    continue
+                if delay > 0:
+                    wait_time = delay if wait_time is None else min(wait_time, delay)
+                    continue
+                item = queues[host].popleft()
+                if not queues[host]:
+                    del queues[host]
+                mode = admit(item) if admit is not None else True
+                dispatched = True
+                if mode is None:
+                    continue
+                in_flight[executor.submit(fn, item, mode)] = (host, item)
+                host_active[host] += 1
+                last_dispatch[host] = time.monotonic()
+        if not in_flight:
+            if queues:
+                time.sleep(wait_time or 0.01)
+            continue
+        done, _ = concurrent.futures.wait(in_flight, timeout=wait_time, return_when=concurrent.futures.FIRST_COMPLETED)
+        for future in done:
+            host, item = in_flight.pop(future)
+            host_active[host] -= 1
+            yield item, future
+
+# ==================== HTTP/2 传输 ====================
+
+HTTP2_ENV = "FEED_HTTP2"          # 设为1时与 --http2 等效
+HTTP2_MAX_CONNECTIONS = 32
+HTTP2_KEEPALIVE_EXPIRY = 30.0
+# HTTP/2 禁止逐跳首部，连接复用由客户端自行管理
+_HOP_BY_HOP_HEADERS = frozenset({"connection", "keep-alive", "proxy-connection", "transfer-encoding", "upgrade"})
+
+class Http2Response:
+    """把httpx响应包装成与requests.Response兼容的最小接口"""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+        self.url = str(resp.url)
+        self.http_version = resp.http_version
+
+    @property
+    def content(self):
+        return self._resp.content
+
+    @property
+    def text(self):
+        return self._resp.text
+
+    def json(self):
+        return self._resp.json()
+
+    def raise_for_status(self):
+        import requests
+        if 400 <= self.status_code < 600:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class Http2Transport:
+    """基于httpx的HTTP/2客户端：同一主机的请求在一条连接上多路复用，异常映射为requests异常"""
+
+    def __init__(self, max_connections=HTTP2_MAX_CONNECTIONS, verify=True):
+        import httpx  # 可选依赖：pip install "httpx[http2]"，缺少h2时此处抛出ImportError
+        self._httpx = httpx
+        self.client = httpx.Client(http2=True, verify=verify, limits=httpx.Limits(max_connections=max_connections,
+                                                                   max_keepalive_connections=max_connections,
+                                                                   keepalive_expiry=HTTP2_KEEPALIVE_EXPIRY))
+        self.versions = Counter()
+        self._lock = threading.Lock()
+
+    def request(self, method, url, timeout, headers=None, allow_redirects=True):
+        import requests
+        httpx = self._httpx
+        headers = {k: v for k, v in (headers or {}).items() if k.lower() not in _HOP_BY_HOP_HEADERS}
+        try:
+            resp = self.client.request(method, url, headers=headers, timeout=timeout, follow_redirects=allow_redirects)
+        except httpx.TimeoutException as e:
+            raise requests.exceptions.Timeout(str(e)) from e
+        except httpx.TransportError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+        except httpx.HTTPError as e:
+            raise requests.exceptions.RequestException(str(e)) from e
+        with self._lock:
+            self.versions[resp.http_version] += 1
+        return Http2Response(resp)
+
+    def close(self):
+        self.client.close()
+        if self.versions:
+            print("[INFO] 🔀 HTTP/2传输协议统计: " + ", ".join(f"{v} {n}次" for v, n in self.versions.most_common()))
+
+_HTTP2_TRANSPORT = None
+_HTTP2_LOCK = threading.Lock()
+# HTTP/1.1 路径每个抓取线程复用一个requests会话（连接池），不再每次请求都新建连接
+_http_sessions = threading.local()
+
+def enable_http2():
+    """启用HTTP/2传输；未安装 httpx[http2] 时提示并继续使用requests"""
+    global _HTTP2_TRANSPORT
+    with _HTTP2_LOCK:
+        if _HTTP2_TRANSPORT is None:
+            try:
+                _HTTP2_TRANSPORT = Http2Transport()
+                atexit.register(_HTTP2_TRANSPORT.close)
+                print("[INFO] 🔀 已启用HTTP/2多路复用传输（httpx）")
+            except ImportError as e:
+                print(f"[WARN] ⚠️ 未安装 httpx[http2]，继续使用requests: {e}")
+    return _HTTP2_TRANSPORT is not None
+
+def http_send(method, url, timeout, headers=None, allow_redirects=True, session=None):
+    """发送一次请求：启用HTTP/2时走共享的httpx客户端，否则走requests（给定会话或本线程的会话）"""
+    if _HTTP2_TRANSPORT is not None:
+        return _HTTP2_TRANSPORT.request(method, url, timeout, headers, allow_redirects)
+    if session is None:
+        session = getattr(_http_sessions, 'session', None)
+        if session is None:
+            import requests
+            session = _http_sessions.session = requests.Session()
+    return session.request(method, url, timeout=timeout, headers=headers, allow_redirects=allow_redirects)
+
+# ==================== 期刊目录 ====================
+
+_ISSN_RE = re.compile(r'[^0-9X]')
+_SLUG_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+
+def normalize_issn(issn):
+    """统一为 XXXX-XXXX 大写形式；无法识别时原样去空白返回"""
+    compact = _ISSN_RE.sub('', (issn or '').upper())
+    if len(compact) == 8:
+        return f"{compact[:4]}-{compact[4:]}"
+    return (issn or '').strip()
+
+def journal_slug(title):
+    clean_title = _SLUG_PUNCTUATION_RE.sub('', (title or '').lower())
+    return "-".join(clean_title.split())
+
+# 常见的两级公共后缀：这些域名下取最后三段才是出版商，否则所有 .co.uk 出版商都会归成 co.uk
+_TWO_LEVEL_SUFFIXES = {
+    "co.uk", "ac.uk", "org.uk", "gov.uk", "com.cn", "ac.cn", "edu.cn", "org.cn", "net.cn", "gov.cn",
+    "co.jp", "ac.jp", "or.jp", "com.au", "edu.au", "org.au", "co.nz", "ac.nz", "com.br", "org.br",
+    "co.in", "ac.in", "co.kr", "ac.kr", "com.tw", "edu.tw", "co.za", "ac.za",
+}
+
+def publisher_domain(url):
+    """RSS地址的主域名（rss.sciencedirect.com → sciencedirect.com）；不含端口，IP地址原样保留"""
+    host = (urlparse(url).hostname or "") if url else ""
+    try:
+        ipaddress.ip_address(host)
+        return host
+    except ValueError:
+        pass
+    labels = host.rstrip(".").split(".")
+    keep = 3 if ".".join(labels[-2:]) in _TWO_LEVEL_SUFFIXES else 2
+    return ".".join(labels[-keep:])
+
+class JournalCatalog:
+    """期刊清单的列式存储：每个字段一列，第i个期刊在各列的第i位；按ISSN、RSS地址、出版商建索引"""
+
+    FIELDS = ("index", "title", "issn", "zone", "rss_url", "rss_source")
+
+    def __init__(self):
+        for field in self.FIELDS:
+            setattr(self, field, [])
+        self.issn_norm = []
+        self.slug = []
+        self.publisher = []
+        self.by_key = {}
+        self.by_issn = {}
+        self.by_feed = {}
+        self.by_publisher = {}
+
+    def __len__(self):
+        return len(self.title)
+
+    @classmethod
+    def load(cls, path):
+        catalog = cls()
+        for encoding in ("utf-8-sig", "latin-1"):
+            try:
+                with open(path, "r", encoding=encoding, newline="") as f:
+                    for row in csv.DictReader(f):
+                        catalog.append(row)
+                break
+            except UnicodeDecodeError:
+                print(f"[ERROR] 文件编码问题，尝试不同编码...")
+                catalog = cls()
+        return catalog
+
+    def append(self, row):
+        i = len(self)
+        title = (row.get("title") or "").strip()
+        issn = (row.get("issn") or "").strip()
+        rss_url = (row.get("rss_url") or "").strip()
+        self.index.append(row.get("index") or i + 1)
+        self.title.append(title)
+        self.issn.append(issn)
+        self.zone.append((row.get("zone") or "").strip())
+        self.rss_url.append(rss_url)
+        self.rss_source.append((row.get("rss_source") or "").strip())
+        issn_norm = normalize_issn(issn)
+        self.issn_norm.append(issn_norm)
+        self.slug.append(journal_slug(title))
+        # 出版商按RSS地址的主域名归类
+        publisher = publisher_domain(rss_url)
+        self.publisher.append(publisher)
+        self.by_key.setdefault(self.key(i), i)
+        if issn_norm:
+            self.by_issn.setdefault(issn_norm, []).append(i)
+        if rss_url:
+            self.by_feed.setdefault(rss_url, i)
+            self.by_publisher.setdefault(publisher, []).append(i)
+
+    def key(self, i):
+        """检查点与合并结果使用的期刊键"""
+        return f"{self.title[i]}|{self.issn[i]}"
+
+    def row(self, i):
+        return {field: getattr(self, field)[i] for field in self.FIELDS}
+
+    def find_by_issn(self, issn):
+        return self.by_issn.get(normalize_issn(issn), [])
+
+    def find_by_feed(self, url):
+        return self.by_feed.get(url)
+
+    def feeds(self):
+        """有RSS源的期刊，转换为抓取阶段使用的字典；多个期刊共用同一RSS地址时只抓取一次"""
+        return [{
+            "url": self.rss_url[i],
+            "title": self.title[i],
+            "source": self.rss_source[i],
+            "zone": self.zone[i],
+            "issn": self.issn[i]
+        } for i in sorted(self.by_feed.values())]
+
+@functools.lru_cache(maxsize=8)
+def _load_journal_catalog(path, mtime_ns, size):
+    return JournalCatalog.load(path)
+
+def get_journal_catalog(path):
+    """同一文件只解析一次；文件被改写（如RSS源发现完成）后自动重新加载"""
+    stat = os.stat(path)
+    return _load_journal_catalog(path, stat.st_mtime_ns, stat.st_size)
 
 # ==================== RSS源发现模块（优化版） ====================
 
 class RSSSourceFinder:
-    def __init__(self, timeout=15):
+    def __init__(self, timeout=15, throttle=None):
         self.timeout = timeout
+        self.throttle = throttle or AdaptiveHostThrottle()
         # 更丰富的 User-Agent 列表，随机使用以降低被屏蔽风险
         self.user_agents = [
             "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
@@ -32,6 +613,7 @@ class RSSSourceFinder:
         
     def _create_session(self):
         """创建具有随机User-Agent的会话"""
+        import requests
         session = requests.Session()
         session.headers.update({
             "User-Agent": random.choice(self.user_agents),
@@ -48,7 +630,7 @@ class RSSSourceFinder:
     def fetch_json(self, url):
         try:
             self._rotate_user_agent()
-            r = self.session.get(url, timeout=self.timeout)
+            r = self.throttle.request(url, lambda: http_send("GET", url, self.timeout, dict(self.session.headers), session=self.session))
             r.raise_for_status()
             return r.json()
         except Exception as e:
@@ -56,6 +638,7 @@ class RSSSourceFinder:
             return None
 
     def fetch_resp(self, url, allow_redirects=True, method="GET", headers=None):
+        import requests
         try:
             self._rotate_user_agent()
             h = dict(self.session.headers)
@@ -63,14 +646,14 @@ class RSSSourceFinder:
                 h.update(headers)
                 
             if method == "HEAD":
-                r = self.session.head(url, timeout=self.timeout, allow_redirects=allow_redirects, headers=h)
+                r = self.throttle.request(url, lambda: http_send("HEAD", url, self.timeout, h, allow_redirects, session=self.session))
             else:
                 # 增加错误处理和重试机制
                 max_retries = 2
                 r = None
                 for attempt in range(max_retries):
                     try:
-                        r = self.session.get(url, timeout=self.timeout, allow_redirects=allow_redirects, headers=h)
+                        r = self.throttle.request(url, lambda: http_send("GET", url, self.timeout, h, allow_redirects, session=self.session))
                         r.raise_for_status()
                         return r
                     except requests.exceptions.RequestException as e:
@@ -146,6 +729,7 @@ class RSSSourceFinder:
         return list(dict.fromkeys(homes))
 
     def extract_feed_links_from_html(self, url, html):
+        from bs4 import BeautifulSoup
         try:
             soup = BeautifulSoup(html, "html.parser")
             feed_urls = set()
@@ -220,12 +804,12 @@ class RSSSourceFinder:
 
         return list(dict.fromkeys(out))
 
-    def try_publisher_specific_feeds(self, journal_title, issn):
-        """尝试各大出版社特定的RSS源格式"""
+    def try_publisher_specific_feeds(self, journal_title, issn, slug=None):
+        """尝试各大出版社特定的RSS源格式；slug可由期刊目录预先计算"""
         feeds = []
         
-        clean_title = re.sub(r'[^\w\s]', '', journal_title.lower())
-        slug = "-".join(clean_title.split())
+        if slug is None:
+            slug = journal_slug(journal_title)
         
         # 1. Elsevier ScienceDirect
         if issn:
@@ -287,15 +871,16 @@ class RSSSourceFinder:
                 
         return feeds
 
-    def find_rss_for_journal(self, title, issn):
+    def find_rss_for_journal(self, title, issn, slug=None):
         """为单个期刊查找RSS源（优化版）"""
+        from bs4 import BeautifulSoup
         try:
             print(f"\n[DEBUG] Finding RSS for: {title} (ISSN: {issn})")
             
             journal_timeout = 60  # 秒
             start_time = time.time()
             
-            publisher_feeds = self.try_publisher_specific_feeds(title, issn)
+            publisher_feeds = self.try_publisher_specific_feeds(title, issn, slug)
             if publisher_feeds:
                 print(f"[DEBUG] Found publisher-specific feed: {publisher_feeds[0]}")
                 return publisher_feeds[0], "publisher_specific"
@@ -351,9 +936,6 @@ class RSSSourceFinder:
         signal.signal(signal.SIGALRM, timeout_handler)
         signal.alarm(1800)  # 30分钟
         
-        rows = []
-        results = []
-        
         try:
             if not os.path.exists(journal_csv_file):
                 print(f"[ERROR] 期刊文件不存在: {journal_csv_file}")
@@ -361,87 +943,115 @@ class RSSSourceFinder:
             if not os.access(journal_csv_file, os.R_OK):
                 print(f"[ERROR] 期刊文件无法读取(权限问题): {journal_csv_file}")
                 return []
-            try:
-                with open(journal_csv_file, "r", encoding="utf-8-sig", newline="") as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
-            except UnicodeDecodeError:
-                print(f"[ERROR] 文件编码问题，尝试不同编码...")
-                with open(journal_csv_file, "r", encoding="latin-1", newline="") as f:
-                    reader = csv.DictReader(f)
-                    rows = list(reader)
+            journals = get_journal_catalog(journal_csv_file)
         except Exception as e:
             print(f"[ERROR] 读取期刊文件失败: {str(e)}")
             return []
         
-        total = len(rows)
-        found_count = 0
+        total = len(journals)
+        fieldnames = ["index", "title", "issn", "zone", "rss_url", "rss_source"]
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        
+        # 上一次的发现结果：本次未处理或未找到的期刊沿用旧的RSS源，已找到的源不会丢失
+        previous = JournalCatalog()
+        if os.path.exists(output_file):
+            try:
+                previous = get_journal_catalog(output_file)
+            except Exception as e:
+                print(f"[WARN] 读取上次RSS发现结果失败: {str(e)}")
+        
+        # 逐条追加的检查点：中断或超时后，下次运行从上次完成的期刊继续
+        checkpoint = CheckpointJournal(output_file + ".journal")
+        records = checkpoint.read()
+        stale_cutoff = (datetime.datetime.now() - datetime.timedelta(days=DISCOVERY_RESUME_MAX_DAYS)).strftime("%Y-%m-%d")
+        if records and records[0].get("date", "") < stale_cutoff:
+            print(f"[INFO] 检查点已超过 {DISCOVERY_RESUME_MAX_DAYS} 天，重新开始完整的RSS源发现")
+            checkpoint.clear()
+            records = []
+        results = {}
+        for record in records:
+            results[record.get("key")] = record.get("result")
+        if results:
+            print(f"[INFO] ♻️ 从检查点恢复 {len(results)}/{total} 个已处理期刊")
+        
+        pending = [i for i in range(total) if journals.key(i) not in results]
+        
+        def discover(i):
+            title = journals.title[i]
+            print(f"[INFO] 📖 处理进度: {i + 1}/{total} - {title[:50]}...")
+            return self.find_rss_for_journal(title, journals.issn_norm[i], journals.slug[i])
         
+        # 多个期刊并发查找，同一主机的并发数与请求间隔由 self.throttle 按响应情况自动调整
+        finished = False
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=DISCOVERY_WORKERS)
         try:
-            for i, row in enumerate(rows, 1):
-                title = row.get("title", "").strip()
-                issn = row.get("issn", "").strip()
-                zone = row.get("zone", "").strip()
-                
-                print(f"[INFO] 📖 处理进度: {i}/{total} - {title[:50]}...")
-                
-                rss_url, rss_source = self.find_rss_for_journal(title, issn)
+            futures = {executor.submit(discover, i): i for i in pending}
+            for future in concurrent.futures.as_completed(futures):
+                i = futures[future]
+                title = journals.title[i]
+                rss_url, rss_source = future.result()
                 
                 result = {
-                    "index": row.get("index", i),
+                    "index": journals.index[i],
                     "title": title,
-                    "issn": issn,
-                    "zone": zone,
+                    "issn": journals.issn[i],
+                    "zone": journals.zone[i],
                     "rss_url": rss_url or "",
                     "rss_source": rss_source or ""
                 }
-                results.append(result)
+                key = journals.key(i)
+                results[key] = result
+                try:
+                    checkpoint.append({"date": today, "key": key, "result": result})
+                except Exception as e:
+                    print(f"[WARN] 写入检查点失败: {str(e)}")
                 
                 if rss_url:
-                    found_count += 1
-                    print(f"[SUCCESS] ✅ 找到RSS源: {rss_source}")
+                    print(f"[SUCCESS] ✅ {title[:40]} 找到RSS源: {rss_source}")
                 else:
-                    print(f"[WARN] ❌ 未找到RSS源")
-                
-                # 速率控制
-                if i % 10 == 0:  # 每10个较长等待
-                    wait_time = random.uniform(5, 10)
-                    print(f"[INFO] 较长等待 {wait_time:.1f} 秒...")
-                    time.sleep(wait_time)
-                elif i % 3 == 0:
-                    wait_time = random.uniform(2, 5)
-                    print(f"[INFO] 等待 {wait_time:.1f} 秒...")
-                    time.sleep(wait_time)
-                
-                # 定期保存临时结果
-                if i % 20 == 0:
-                    try:
-                        temp_file = output_file + ".temp"
-                        fieldnames = ["index", "title", "issn", "zone", "rss_url", "rss_source"]
-                        with open(temp_file, "w", encoding="utf-8", newline="") as f:
-                            writer = csv.DictWriter(f, fieldnames=fieldnames)
-                            writer.writeheader()
-                            writer.writerows(results)
-                        print(f"[INFO] 💾 临时结果已保存至: {temp_file}")
-                    except Exception as e:
-                        print(f"[WARN] 保存临时结果失败: {str(e)}")
+                    print(f"[WARN] ❌ {title[:40]} 未找到RSS源")
+            finished = True
         except TimeoutError:
-            print("[ERROR] RSS源查找处理超时，返回已处理的结果")
+            print(f"[ERROR] RSS源查找处理超时，已处理 {len(results)}/{total} 个期刊，检查点已保留，下次运行将继续")
         finally:
             signal.alarm(0)
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        merged = []
+        kept_count = 0
+        for i in range(total):
+            key = journals.key(i)
+            result = results.get(key)
+            old = previous.by_key.get(key)
+            if old is None:
+                # 期刊列表中标题写法改了但ISSN未变，同样沿用上次找到的源
+                matches = previous.find_by_issn(journals.issn[i])
+                old = matches[0] if len(matches) == 1 else None
+            if old is not None and previous.rss_url[old] and not (result and result.get("rss_url")):
+                result = previous.row(old)
+                kept_count += 1
+            if result is None:
+                result = journals.row(i)
+                result["rss_url"] = ""
+                result["rss_source"] = ""
+            merged.append(result)
+        found_count = len([r for r in merged if r["rss_url"]])
+        
+        def write_rows(f):
+            writer = csv.DictWriter(f, fieldnames=fieldnames)
+            writer.writeheader()
+            writer.writerows(merged)
         
         try:
-            fieldnames = ["index", "title", "issn", "zone", "rss_url", "rss_source"]
-            with open(output_file, "w", encoding="utf-8", newline="") as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(results)
-            print(f"[INFO] 📊 RSS源查找完成: {found_count}/{total} 个期刊找到RSS源")
+            atomic_write(output_file, write_rows, newline="")
+            print(f"[INFO] 📊 RSS源查找完成: {found_count}/{total} 个期刊找到RSS源（沿用上次结果 {kept_count} 个）")
             print(f"[INFO] 💾 结果已保存至: {output_file}")
+            if finished:
+                checkpoint.clear()
         except Exception as e:
             print(f"[ERROR] 保存RSS结果失败: {str(e)}")
         
-        return [r for r in results if r["rss_url"]]
+        return [r for r in merged if r["rss_url"]]
 
 # ==================== 主推送系统 ====================
 
@@ -469,49 +1079,234 @@ ZONE_WEIGHTS = {
     "3区": 20,
     "4区": 10,
     "": 15
+}
 
-
-WECHAT_WEBHOOK = "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=d'saho'ifvhaDVBAVNSOVSNAP"
+WECHAT_WEBHOOK = os.getenv("WECHAT_WEBHOOK", "https://qyapi.weixin.qq.com/cgi-bin/webhook/send?key=d'saho'ifvhaDVBAVNSOVSNAP")
+# 企业微信文本消息上限2048字节，留出余量；机器人限速每分钟20条
+WECHAT_MAX_MESSAGE_BYTES = 2000
+WECHAT_RATE_LIMIT_PER_MINUTE = 20
+WECHAT_PUSH_TIMEOUT = 10
+WECHAT_PUSH_RETRIES = 4
+# 只有暂时性错误才重试：-1 系统繁忙，45009 调用频率超限，45033 并发超限；无效key等其余错误码重试也不会成功
+WECHAT_TRANSIENT_ERRCODES = {-1, 45009, 45033}
+WECHAT_RATE_LIMITED_WAIT = 60
 
 EXCLUDED_KEYWORDS = [
     "carbonate", "limestone", "dolomite", "microbial", "hydrogen", "oxidation", "ocean",
     "碳酸盐", "灰岩", "白云岩", "微生物", "氢", "氧化", "海洋", "矿化"
 ]
 
+class KeywordMatcher:
+    """预处理好的关键词表：只小写化一次，供打分与短语过滤反复使用"""
+
+    def __init__(self, core, auxiliary, excluded):
+        self.core = tuple(dict.fromkeys(k.lower() for k in core))
+        self.auxiliary = tuple(dict.fromkeys(k.lower() for k in auxiliary))
+        self.excluded = tuple(dict.fromkeys(k.lower() for k in excluded))
+        # 是否命中核心词只需一次正则扫描
+        self.core_pattern = re.compile("|".join(re.escape(k) for k in self.core)) if self.core else None
+
+# 外部关键词配置：keywords.json 中未给出的字段沿用上面的内置常量
+KEYWORDS_FILE = "keywords.json"
+KEYWORDS_RELOAD_INTERVAL = 1.0  # 检查配置文件是否变化的最小间隔（秒）
+
+class KeywordConfig:
+    """编译好的关键词配置，hash 为补全内置默认值后的生效配置的摘要"""
+
+    def __init__(self, core_keywords, auxiliary_keywords, excluded_keywords, zone_weights):
+        self.core_keywords = list(core_keywords)
+        self.auxiliary_keywords = list(auxiliary_keywords)
+        self.excluded_keywords = list(excluded_keywords)
+        self.zone_weights = dict(zone_weights)
+        # 对生效配置取摘要：内置默认值变化时，省略了这些字段的配置文件同样会触发重新打分
+        effective = json.dumps([self.core_keywords, self.auxiliary_keywords, self.excluded_keywords, self.zone_weights],
+                               ensure_ascii=False, sort_keys=True)
+        self.hash = hashlib.sha256(effective.encode('utf-8')).hexdigest()
+        self.matcher = KeywordMatcher(core_keywords, auxiliary_keywords, excluded_keywords)
+
+def _builtin_keyword_config():
+    return KeywordConfig(CORE_KEYWORDS, AUXILIARY_KEYWORDS, EXCLUDED_KEYWORDS, ZONE_WEIGHTS)
+
+def load_keyword_config(path=KEYWORDS_FILE):
+    """读取并编译关键词配置；未给出的字段沿用内置值"""
+    if not os.path.exists(path):
+        return _builtin_keyword_config()
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    def keyword_list(field, default):
+        value = data.get(field, default)
+        if not isinstance(value, list) or not all(isinstance(k, str) for k in value):
+            raise ValueError(f"{field} 必须是字符串列表")
+        return value
+    zone_weights = data.get("zone_weights", ZONE_WEIGHTS)
+    if not isinstance(zone_weights, dict) or not all(isinstance(v, (int, float)) for v in zone_weights.values()):
+        raise ValueError("zone_weights 必须是 分区: 数值 的字典")
+    return KeywordConfig(
+        keyword_list("core_keywords", CORE_KEYWORDS),
+        keyword_list("auxiliary_keywords", AUXILIARY_KEYWORDS),
+        keyword_list("excluded_keywords", EXCLUDED_KEYWORDS),
+        zone_weights
+    )
+
+_keyword_config_state = {'config': None, 'signature': None, 'checked': 0.0}
+_keyword_config_lock = threading.Lock()
+
+def get_keyword_config():
+    """当前生效的关键词配置；配置文件修改后自动重新加载，无需重启或重新抓取"""
+    with _keyword_config_lock:
+        state = _keyword_config_state
+        now = time.monotonic()
+        if state['config'] is not None and now - state['checked'] < KEYWORDS_RELOAD_INTERVAL:
+            return state['config']
+        state['checked'] = now
+        try:
+            stat = os.stat(KEYWORDS_FILE)
+            signature = (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            signature = None
+        if state['config'] is not None and signature == state['signature']:
+            return state['config']
+        try:
+            config = load_keyword_config()
+            if state['config'] is not None and config.hash != state['config'].hash:
+                print(f"[INFO] 🔁 关键词配置已重新加载 ({config.hash[:8]})")
+            state['config'] = config
+        except Exception as e:
+            print(f"[ERROR] 关键词配置 {KEYWORDS_FILE} 无效，继续使用{'上一版' if state['config'] else '内置'}配置: {e}")
+            if state['config'] is None:
+                state['config'] = _builtin_keyword_config()
+        state['signature'] = signature
+        return state['config']
+
+def get_keyword_matcher():
+    return get_keyword_config().matcher
+
 HISTORY_FILE = "pushed_articles.json"
 PUSH_SCHEDULE_FILE = "push_schedule.json"
 RSS_STATUS_FILE = "rss_status.json"
 JOURNAL_RSS_FILE = "journals_with_rss.csv"
 JOURNAL_LIST_FILE = "journals_1-260.csv"
+CANDIDATE_LOG_FILE = "candidate_log.jsonl"
+PHRASE_TREND_FILE = "phrase_trends.jsonl"
+FETCH_CHECKPOINT_FILE = "fetch_checkpoint.jsonl"
+ARTICLE_INDEX_FILE = "article_index.db"  # 所有解析过的条目的全文索引（SQLite FTS5）
+RUNS_DIR = "runs"             # 每次运行的原始RSS内容与各阶段结果，用于不联网重新打分
+RUN_CACHE_KEEP_DAYS = 14
 HISTORY_DAYS = 60
+BACKFILL_WINDOW_DAYS = 10
 DUPLICATE_CHECK_DAYS = 7
 MAX_PUSH_PER_BATCH = 6
 
 TRANSLATE_API_URL = "https://api.mymemory.translated.net/get"
 
+# 多研究组配置：每组有自己的关键词、去重历史、推送计划与推送目标，共享同一次抓取
+PROFILES_FILE = "profiles.json"
+DEFAULT_PROFILE_NAME = "default"
+
+def _profile_path(path, name):
+    if name == DEFAULT_PROFILE_NAME:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{name}{ext}"
+
+class KeywordProfile:
+    """一个研究组的关键词配置；未指定的字段沿用 keywords.json（或内置常量），并随其热更新"""
+
+    def __init__(self, name=DEFAULT_PROFILE_NAME, core_keywords=None, auxiliary_keywords=None,
+                 excluded_keywords=None, zone_weights=None, webhook=None, title=None):
+        self.name = re.sub(r'[^\w-]', '_', name)
+        self.core_keywords = core_keywords
+        self.auxiliary_keywords = auxiliary_keywords
+        self.excluded_keywords = excluded_keywords
+        self._zone_weights = zone_weights
+        self._matcher = None
+        self._matcher_hash = None
+        self.webhook = webhook or WECHAT_WEBHOOK
+        self.title = title or "🏔️ 折叠地层推送"
+        self.history_file = _profile_path(HISTORY_FILE, self.name)
+        self.schedule_file = _profile_path(PUSH_SCHEDULE_FILE, self.name)
+        self.candidate_log_file = _profile_path(CANDIDATE_LOG_FILE, self.name)
+        self.trend_file = _profile_path(PHRASE_TREND_FILE, self.name)
+
+    @property
+    def matcher(self):
+        config = get_keyword_config()
+        if self.core_keywords is None and self.auxiliary_keywords is None and self.excluded_keywords is None:
+            return config.matcher
+        # 部分覆盖的配置在共享配置变化时重新编译
+        if self._matcher_hash != config.hash:
+            self._matcher = KeywordMatcher(
+                config.core_keywords if self.core_keywords is None else self.core_keywords,
+                config.auxiliary_keywords if self.auxiliary_keywords is None else self.auxiliary_keywords,
+                config.excluded_keywords if self.excluded_keywords is None else self.excluded_keywords
+            )
+            self._matcher_hash = config.hash
+        return self._matcher
+
+    @property
+    def zone_weights(self):
+        return self._zone_weights or get_keyword_config().zone_weights
+
+def scoring_signature(profiles):
+    """影响打分结果的全部配置的摘要，变化后内容未变的RSS源也要重新打分"""
+    digest = hashlib.sha256(get_keyword_config().hash.encode('utf-8'))
+    for profile in profiles:
+        overrides = [profile.name, profile.core_keywords, profile.auxiliary_keywords, profile.excluded_keywords, profile._zone_weights]
+        digest.update(json.dumps(overrides, ensure_ascii=False, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def load_profiles(path=PROFILES_FILE):
+    """读取 profiles.json；文件不存在或无效时只运行默认配置"""
+    if not os.path.exists(path):
+        return [KeywordProfile()]
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        profiles = []
+        for item in data.get("profiles", []):
+            profiles.append(KeywordProfile(
+                name=item.get("name", DEFAULT_PROFILE_NAME),
+                core_keywords=item.get("core_keywords"),
+                auxiliary_keywords=item.get("auxiliary_keywords"),
+                excluded_keywords=item.get("excluded_keywords"),
+                zone_weights=item.get("zone_weights"),
+                webhook=item.get("webhook"),
+                title=item.get("title")
+            ))
+        if len({p.name for p in profiles}) != len(profiles):
+            raise ValueError("配置名称重复")
+        if profiles:
+            return profiles
+        print(f"[WARN] {path} 中没有配置，使用默认配置")
+    except Exception as e:
+        print(f"[ERROR] 读取多研究组配置失败: {e}，使用默认配置")
+    return [KeywordProfile()]
+
 # 每周更新RSS源的星期配置：Python中周一=0，周日=6
 WEEKLY_RSS_UPDATE_DAY = 6  # 周日
 
+# 并发线程数；同一主机的实际并发与间隔由 AdaptiveHostThrottle 自动调整
+FETCH_WORKERS = 8
+DISCOVERY_WORKERS = 4
+# 熔断器：单个源连续失败达到阈值后熔断，之后按 1,2,4...天 的间隔半开探测
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_MAX_BACKOFF_DAYS = 32
+# 同一主机有这么多个源一起失败时，整台主机熔断
+HOST_TRIP_MIN_FEEDS = 3
+
+# 未完成的RSS源发现检查点最多保留的天数，超过后重新开始完整发现
+DISCOVERY_RESUME_MAX_DAYS = 7
+
 def load_rss_feeds_from_csv(csv_file):
-    feeds = []
     try:
-        with open(csv_file, "r", encoding="utf-8-sig", newline="") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                rss_url = row.get("rss_url", "").strip()
-                if rss_url:
-                    feeds.append({
-                        "url": rss_url,
-                        "title": row.get("title", ""),
-                        "source": row.get("rss_source", ""),
-                        "zone": row.get("zone", ""),
-                        "issn": row.get("issn", "")
-                    })
+        return get_journal_catalog(csv_file).feeds()
     except FileNotFoundError:
         print(f"[WARN] RSS源文件不存在: {csv_file}")
-    return feeds
+        return []
 
+@functools.lru_cache(maxsize=4096)
 def translate_to_chinese(text):
+    import requests
     try:
         if any('\u4e00' <= char <= '\u9fff' for char in text):
             return text
@@ -542,43 +1337,40 @@ def load_rss_status():
 
 def save_rss_status(status):
     try:
-        with open(RSS_STATUS_FILE, 'w', encoding='utf-8') as f:
-            json.dump(status, f, ensure_ascii=False, indent=2)
+        atomic_write_json(RSS_STATUS_FILE, status)
     except Exception as e:
         print(f"[ERROR] 保存RSS状态失败: {e}")
 
-def load_pushed_articles():
-    if os.path.exists(HISTORY_FILE):
+def load_pushed_articles(path=HISTORY_FILE):
+    if os.path.exists(path):
         try:
-            with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
+            with open(path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             print(f"[ERROR] 读取历史记录失败: {e}")
             return {}
     return {}
 
-def save_pushed_articles(pushed_articles):
+def save_pushed_articles(pushed_articles, path=HISTORY_FILE):
     try:
-        with open(HISTORY_FILE, 'w', encoding='utf-8') as f:
-            json.dump(pushed_articles, f, ensure_ascii=False, indent=2)
+        atomic_write_json(path, pushed_articles)
         print(f"[INFO] 历史记录已保存")
     except Exception as e:
         print(f"[ERROR] 保存历史记录失败: {e}")
 
-def load_push_schedule():
-    if os.path.exists(PUSH_SCHEDULE_FILE):
+def load_push_schedule(path=PUSH_SCHEDULE_FILE):
+    if os.path.exists(path):
         try:
-            with open(PUSH_SCHEDULE_FILE, 'r', encoding='utf-8') as f:
+            with open(path, 'r', encoding='utf-8') as f:
                 return json.load(f)
         except Exception as e:
             print(f"[ERROR] 读取推送计划失败: {e}")
             return {}
     return {}
 
-def save_push_schedule(schedule):
+def save_push_schedule(schedule, path=PUSH_SCHEDULE_FILE):
     try:
-        with open(PUSH_SCHEDULE_FILE, 'w', encoding='utf-8') as f:
-            json.dump(schedule, f, ensure_ascii=False, indent=2)
+        atomic_write_json(path, schedule)
         print(f"[INFO] 推送计划已保存")
     except Exception as e:
         print(f"[ERROR] 保存推送计划失败: {e}")
@@ -632,43 +1424,233 @@ def extract_publication_date(entry):
                 pass
     return None
 
-def calculate_priority_score(text, zone=""):
+def calculate_priority_score(text, zone="", profile=None):
+    matcher = profile.matcher if profile else get_keyword_matcher()
+    zone_weights = profile.zone_weights if profile else get_keyword_config().zone_weights
     text_lower = text.lower()
-    core_matches = sum(1 for k in CORE_KEYWORDS if k.lower() in text_lower)
-    aux_matches = sum(1 for k in AUXILIARY_KEYWORDS if k.lower() in text_lower)
+    core_matches = sum(1 for k in matcher.core if k in text_lower)
+    aux_matches = sum(1 for k in matcher.auxiliary if k in text_lower)
     keyword_score = core_matches * 10 + aux_matches * 1
-    zone_weight = ZONE_WEIGHTS.get(zone, ZONE_WEIGHTS[""])
+    zone_weight = zone_weights.get(zone, zone_weights.get("", 0))
     priority_score = keyword_score + zone_weight
     return priority_score, core_matches, aux_matches, zone_weight
 
-def extract_meaningful_phrases(text):
-    text = re.sub(r'[^\w\s\u4e00-\u9fff-]', ' ', text)
-    text = re.sub(r'\s+', ' ', text).strip()
+_PUNCTUATION_RE = re.compile(r'[^\w\s\u4e00-\u9fff-]')
+_WHITESPACE_RE = re.compile(r'\s+')
+_ENGLISH_PHRASE_RE = re.compile(r'\b[A-Za-z][\w-]*(?:\s+[A-Za-z][\w-]*){1,3}\b')
+_CHINESE_PHRASE_RE = re.compile(r'[\u4e00-\u9fff]{2,8}')
+STOP_PHRASES = ("in the", "of the", "and the", "for the", "this is", "there are")
+
+def extract_meaningful_phrases(text, matcher=None):
+    excluded = (matcher or get_keyword_matcher()).excluded
+    text = _PUNCTUATION_RE.sub(' ', text)
+    text = _WHITESPACE_RE.sub(' ', text).strip()
     phrases = []
-    english_phrases = re.findall(r'\b[A-Za-z][\w-]*(?:\s+[A-Za-z][\w-]*){1,3}\b', text)
+    english_phrases = _ENGLISH_PHRASE_RE.findall(text)
     for phrase in english_phrases:
         phrase = phrase.strip().lower()
         words = phrase.split()
         if 2 <= len(words) <= 4 and 6 <= len(phrase) <= 40:
             if not all(w.isdigit() for w in words) and not all(len(w) <= 2 for w in words):
-                should_exclude = any(ex.lower() in phrase for ex in EXCLUDED_KEYWORDS)
-                stop_phrases = ["in the", "of the", "and the", "for the", "this is", "there are"]
-                if any(phrase.startswith(stop) for stop in stop_phrases):
+                should_exclude = any(ex in phrase for ex in excluded)
+                if phrase.startswith(STOP_PHRASES):
                     should_exclude = True
                 if not should_exclude:
                     phrases.append(phrase)
-    chinese_phrases = re.findall(r'[\u4e00-\u9fff]{2,8}', text)
+    chinese_phrases = _CHINESE_PHRASE_RE.findall(text)
     for phrase in chinese_phrases:
         if 2 <= len(phrase) <= 8:
-            if not any(ex in phrase for ex in EXCLUDED_KEYWORDS):
+            if not any(ex in phrase for ex in excluded):
                 phrases.append(phrase)
     return phrases
 
-def has_core_keywords(text):
+def has_core_keywords(text, matcher=None):
     text_lower = text.lower()
-    return any(keyword.lower() in text_lower for keyword in CORE_KEYWORDS)
+    pattern = (matcher or get_keyword_matcher()).core_pattern
+    return pattern is not None and pattern.search(text_lower) is not None
+
+# ==================== 全文索引 ====================
+
+class ArticleIndex:
+    """所有解析过的条目（不仅是命中关键词的）存入SQLite；有FTS5时用BM25排序，否则退化为LIKE查询"""
+
+    def __init__(self, path=ARTICLE_INDEX_FILE):
+        import sqlite3
+        self.path = path
+        # 分片模式下多个进程共用同一个索引文件，写锁冲突时等待
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "id INTEGER PRIMARY KEY, hash TEXT UNIQUE, title TEXT, summary TEXT, link TEXT, "
+            "journal TEXT, zone TEXT, pub_date TEXT, seen_date TEXT)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_seen ON articles(seen_date)")
+        try:
+            # porter词干：oxidation/oxidized 等变形也能命中
+            self.conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(title, summary, journal, tokenize='porter unicode61')")
+            self.fts = True
+        except sqlite3.OperationalError:
+            print("[WARN] 当前SQLite不支持FTS5，全文检索退化为LIKE匹配")
+            self.fts = False
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
 
-def filter_articles(feed_info, today, pushed_articles, rss_status):
+    def add(self, entries, feed_info, seen_date):
+        """增量写入：按文章hash去重，返回新增条数"""
+        added = 0
+        for entry in entries:
+            cursor = self.conn.execute(
+                "INSERT OR IGNORE INTO articles (hash, title, summary, link, journal, zone, pub_date, seen_date) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (entry['hash'], entry['title'], entry['summary'], entry['link'],
+                 feed_info.get('title', ""), feed_info.get('zone', ""), entry.get('pub_date'), seen_date)
+            )
+            if cursor.rowcount != 1:
+                continue
+            added += 1
+            if self.fts:
+                self.conn.execute(
+                    "INSERT INTO articles_fts (rowid, title, summary, journal) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, entry['title'], entry['summary'], feed_info.get('title', ""))
+                )
+        self.conn.commit()
+        return added
+
+    def prune(self, cutoff):
+        """删除 seen_date 早于cutoff的条目"""
+        if self.fts:
+            self.conn.execute("DELETE FROM articles_fts WHERE rowid IN (SELECT id FROM articles WHERE seen_date < ?)", (cutoff,))
+        cursor = self.conn.execute("DELETE FROM articles WHERE seen_date < ?", (cutoff,))
+        self.conn.commit()
+        return cursor.rowcount
+
+    def count(self):
+        return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def search(self, query, limit=20):
+        """支持FTS5查询语法（"pyrite oxidation" 短语、AND/OR/NOT）；标题权重最高，其次期刊名、摘要"""
+        import sqlite3
+        columns = "a.title, a.link, a.journal, a.zone, a.pub_date, a.seen_date"
+        if self.fts:
+            sql = (f"SELECT {columns}, bm25(articles_fts, 10.0, 1.0, 2.0) AS rank FROM articles_fts "
+                   "JOIN articles a ON a.id = articles_fts.rowid WHERE articles_fts MATCH ? ORDER BY rank LIMIT ?")
+            try:
+                return self.conn.execute(sql, (query, limit)).fetchall()
+            except sqlite3.OperationalError:
+                # 查询里有FTS语法字符（如连字符、冒号）时按普通词重新查询
+                terms = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+                try:
+                    return self.conn.execute(sql, (terms, limit)).fetchall()
+                except sqlite3.OperationalError as e:
+                    print(f"[WARN] 无法解析检索词 “{query}”: {e}")
+                    return []
+        where = " AND ".join("(a.title LIKE ? OR a.summary LIKE ?)" for _ in query.split())
+        params = [value for term in query.split() for value in (f"%{term}%", f"%{term}%")]
+        sql = f"SELECT {columns}, 0 AS rank FROM articles a WHERE {where or '1'} ORDER BY a.seen_date DESC LIMIT ?"
+        return self.conn.execute(sql, params + [limit]).fetchall()
+
+# ==================== 分阶段运行缓存 ====================
+
+PIPELINE_STAGES = ("fetch", "parse", "score", "select", "push")
+
+class RunCache:
+    """一次运行的阶段产物：runs/<日期>/raw/ 下按源保存gzip压缩的原始内容，manifest.jsonl 记录对应的源信息"""
+
+    def __init__(self, run_date, root=RUNS_DIR):
+        self.run_date = run_date
+        self.run_dir = os.path.join(root, run_date)
+        self.raw_dir = os.path.join(self.run_dir, "raw")
+        self.manifest = CheckpointJournal(os.path.join(self.run_dir, "manifest.jsonl"))
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return self.manifest.exists()
+
+    def store_raw(self, feed_info, content):
+        """抓取阶段产物：同一天重复抓取同一源时覆盖为最新内容"""
+        name = hashlib.sha1(feed_info["url"].encode('utf-8')).hexdigest() + ".xml.gz"
+        path = os.path.join(self.raw_dir, name)
+        os.makedirs(self.raw_dir, exist_ok=True)
+        import gzip
+        with gzip.open(f"{path}.tmp", 'wb') as f:
+            f.write(content)
+        os.replace(f"{path}.tmp", path)
+        with self._lock:
+            self.manifest.append({
+                'feed': feed_info["url"],
+                'title': feed_info.get("title", ""),
+                'zone': feed_info.get("zone", ""),
+                'source': feed_info.get("source", "unknown"),
+                'file': name,
+                'size': len(content),
+                'fetched_at': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            })
+
+    def iter_raw(self):
+        """按manifest逐个读取原始内容，返回 (feed_info, content)"""
+        import gzip
+        records = {}
+        for record in self.manifest.read():
+            records[record['feed']] = record
+        for record in records.values():
+            path = os.path.join(self.raw_dir, record['file'])
+            try:
+                with gzip.open(path, 'rb') as f:
+                    content = f.read()
+            except Exception as e:
+                print(f"[WARN] 读取原始RSS缓存失败 {path}: {e}")
+                continue
+            feed_info = {'url': record['feed'], 'title': record.get('title', ""), 'zone': record.get('zone', ""), 'source': record.get('source', "unknown")}
+            yield feed_info, content
+
+    def save_stage(self, stage, data):
+        """保存parse/score阶段的产物，供 --from-stage 从下一阶段继续"""
+        import gzip
+        os.makedirs(self.run_dir, exist_ok=True)
+        path = os.path.join(self.run_dir, f"{stage}.json.gz")
+        with gzip.open(f"{path}.tmp", 'wt', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(f"{path}.tmp", path)
+
+    def load_stage(self, stage):
+        import gzip
+        path = os.path.join(self.run_dir, f"{stage}.json.gz")
+        if not os.path.exists(path):
+            return None
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            print(f"[WARN] 读取阶段缓存失败 {path}: {e}")
+            return None
+
+def prune_run_caches(today, keep_days=RUN_CACHE_KEEP_DAYS, root=RUNS_DIR):
+    """删除超过保留天数的运行目录"""
+    if not os.path.isdir(root):
+        return
+    cutoff = (datetime.datetime.strptime(today, "%Y-%m-%d") - datetime.timedelta(days=keep_days)).strftime("%Y-%m-%d")
+    for name in os.listdir(root):
+        if re.fullmatch(r'\d{4}-\d{2}-\d{2}', name) and name < cutoff:
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+def fetch_feed_entries(feed_info, today, rss_status, max_retries=3, throttle=None, run_cache=None, scoring_hash=None):
+    """下载并解析一个RSS源，返回条目列表；各关键词配置共享这一次抓取与解析"""
+    with profile_stage("fetch"):
+        content = fetch_feed_payload(feed_info, today, rss_status, max_retries=max_retries, throttle=throttle)
+    if content is None:
+        return []
+    if run_cache is not None:
+        try:
+            run_cache.store_raw(feed_info, content)
+        except Exception as e:
+            print(f"[WARN] 保存原始RSS内容失败: {e}")
+    with profile_stage("parse"):
+        return parse_feed_payload(content, feed_info, today, rss_status, scoring_hash)
+
+def fetch_feed_payload(feed_info, today, rss_status, max_retries=3, throttle=None):
+    """抓取阶段：下载RSS原始内容，失败时记录状态并返回None"""
+    import requests
     feed_url = feed_info["url"]
     feed_title = feed_info.get("title", "")
     feed_zone = feed_info.get("zone", "")
@@ -685,95 +1667,163 @@ def filter_articles(feed_info, today, pushed_articles, rss_status):
         zone_display = f"[{feed_zone}]" if feed_zone else ""
         print(f"[INFO] 🔍 正在读取RSS: {feed_title[:30]}...{zone_display} ({feed_info.get('source', 'unknown')})")
         
-        max_retries = 3
         resp = None
+        def send():
+            return http_send("GET", feed_url, 15, headers)
+        
         for attempt in range(max_retries):
+            resp = None
             try:
-                resp = requests.get(feed_url, timeout=15, headers=headers, allow_redirects=True)
+                resp = throttle.request(feed_url, send) if throttle else send()
                 resp.raise_for_status()
                 break
             except requests.exceptions.RequestException as e:
-                if attempt < max_retries - 1:
-                    print(f"[WARN] 第{attempt+1}次尝试失败，等待重试: {e}")
-                    time.sleep(2)
-                    continue
-                else:
+                # 主机吃力时限速器会把间隔加倍，等待过长就放弃该源，交给熔断器和下次运行
+                if attempt >= max_retries - 1 or (throttle and throttle.dispatch_delay(feed_url, 0) > RETRY_MAX_HOST_WAIT):
                     raise e
-        
-        rss_status[feed_url] = {
-            'last_success': today,
-            'status': 'success',
-            'error': None,
-            'journal': feed_title,
-            'zone': feed_zone
-        }
-        
-        feed = feedparser.parse(resp.content)
-        if not hasattr(feed, 'entries') or len(feed.entries) == 0:
-            print(f"[WARN] RSS源返回空内容: {feed_title}")
-            rss_status[feed_url]['status'] = 'empty'
-            return [], []
-        
-        filtered_articles = []
-        all_meaningful_phrases = []
-        duplicate_count = 0
-        total_articles = len(feed.entries)
-        
-        for entry in feed.entries:
-            title = entry.title or ""
-            link = entry.link or ""
-            summary = entry.get("summary", "") or entry.get("description", "") or ""
-            pub_date = extract_publication_date(entry)
-            article_hash = generate_article_hash(title, link)
-            if is_article_duplicate(article_hash, pushed_articles, today):
-                duplicate_count += 1
-                continue
-            text = title + " " + summary
-            meaningful_phrases = extract_meaningful_phrases(text)
-            all_meaningful_phrases.extend(meaningful_phrases)
-            if has_core_keywords(text):
-                priority_score, core_matches, aux_matches, zone_weight = calculate_priority_score(text, feed_zone)
-                chinese_title = translate_to_chinese(title)
-                article_info = {
-                    'title': title,
-                    'chinese_title': chinese_title,
-                    'link': link,
-                    'hash': article_hash,
-                    'priority_score': priority_score,
-                    'core_matches': core_matches,
-                    'aux_matches': aux_matches,
-                    'zone': feed_zone,
-                    'zone_weight': zone_weight,
-                    'source': feed_title,
-                    'source_type': feed_info.get('source', 'unknown'),
-                    'text': text,
-                    'pub_date': pub_date or "未知日期"
-                }
-                filtered_articles.append(article_info)
-        
-        print(f"[INFO] ✅ 共{total_articles}篇，筛选{len(filtered_articles)}条核心匹配，跳过{duplicate_count}条重复")
-        return filtered_articles, all_meaningful_phrases
+                print(f"[WARN] 第{attempt+1}次尝试失败，等待重试: {e}")
+                # 429/503 的等待时间（含Retry-After）已由限速器安排，其余错误短暂停顿
+                rate_limited = resp is not None and resp.status_code in (429, 503)
+                if not (throttle and rate_limited):
+                    time.sleep(2)
+        return resp.content
         
     except requests.exceptions.Timeout:
         error_msg = "⏰ 请求超时"
         print(f"[ERROR] {feed_title} {error_msg}")
         rss_status[feed_url] = {'last_attempt': today, 'status': 'timeout', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone}
-        return [], []
+        return None
     except requests.exceptions.HTTPError as e:
         error_msg = f"HTTP错误: {e.response.status_code}"
         print(f"[ERROR] {feed_title} {error_msg}")
-        rss_status[feed_url] = {'last_attempt': today, 'status': 'http_error', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone}
-        return [], []
+        rss_status[feed_url] = {'last_attempt': today, 'status': 'http_error', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone,
+                                'http_status': e.response.status_code}
+        return None
     except requests.exceptions.ConnectionError:
         error_msg = "连接错误"
         print(f"[ERROR] {feed_title} {error_msg}")
         rss_status[feed_url] = {'last_attempt': today, 'status': 'connection_error', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone}
-        return [], []
+        return None
     except Exception as e:
         error_msg = f"未知错误: {str(e)}"
         print(f"[ERROR] {feed_title} {error_msg}")
         rss_status[feed_url] = {'last_attempt': today, 'status': 'unknown_error', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone}
-        return [], []
+        return None
+
+def parse_feed_payload(content, feed_info, today, rss_status=None, scoring_hash=None):
+    """解析阶段：把原始内容解析为条目列表；传入rss_status时按摘要跳过未变化的源（从缓存重放时不跳过）"""
+    import feedparser
+    feed_url = feed_info["url"]
+    feed_title = feed_info.get("title", "")
+    feed_zone = feed_info.get("zone", "")
+    
+    try:
+        unchanged_before = False
+        if rss_status is not None:
+            # 很多出版商不支持条件请求，总是返回200和相同内容：与上次摘要一致时直接跳过解析和打分
+            previous = rss_status.get(feed_url) or {}
+            # 关键词或权重配置变化后，内容未变的源也需要重新打分
+            unchanged_before = previous.get('status') == 'success' and previous.get('scoring_hash') == scoring_hash
+            content_digest = hashlib.sha256(content).hexdigest()
+            rss_status[feed_url] = {
+                'last_success': today,
+                'status': 'success',
+                'error': None,
+                'journal': feed_title,
+                'zone': feed_zone,
+                'content_digest': content_digest,
+                'entries_digest': previous.get('entries_digest'),
+                'scoring_hash': scoring_hash
+            }
+            if unchanged_before and content_digest == previous.get('content_digest'):
+                print(f"[INFO] ⏭️ 内容与上次相同，跳过解析与打分")
+                return []
+        
+        feed = feedparser.parse(content)
+        if not hasattr(feed, 'entries') or len(feed.entries) == 0:
+            print(f"[WARN] RSS源返回空内容: {feed_title}")
+            if rss_status is not None:
+                rss_status[feed_url]['status'] = 'empty'
+            return []
+        
+        if rss_status is not None:
+            # 正文有差异（如时间戳）但条目GUID顺序完全相同，同样无需重新打分
+            guids = [entry.get('id') or entry.get('link') or entry.get('title') or "" for entry in feed.entries]
+            entries_digest = hashlib.sha256("\n".join(guids).encode('utf-8')).hexdigest()
+            rss_status[feed_url]['entries_digest'] = entries_digest
+            if unchanged_before and entries_digest == previous.get('entries_digest'):
+                print(f"[INFO] ⏭️ 条目列表与上次相同，跳过短语提取与打分")
+                return []
+        
+        entries = []
+        for entry in feed.entries:
+            title = entry.get("title") or ""
+            link = entry.get("link") or ""
+            summary = entry.get("summary", "") or entry.get("description", "") or ""
+            entries.append({
+                'title': title,
+                'link': link,
+                'summary': summary,
+                'pub_date': extract_publication_date(entry),
+                'hash': generate_article_hash(title, link)
+            })
+        return entries
+    
+    except Exception as e:
+        error_msg = f"未知错误: {str(e)}"
+        print(f"[ERROR] {feed_title} {error_msg}")
+        if rss_status is not None:
+            rss_status[feed_url] = {'last_attempt': today, 'status': 'unknown_error', 'error': error_msg, 'journal': feed_title, 'zone': feed_zone}
+        return []
+
+def score_feed_entries(entries, feed_info, today, pushed_articles, profile=None, translate=True):
+    """按一个关键词配置对已解析的条目去重、提取短语并打分"""
+    feed_title = feed_info.get("title", "")
+    feed_zone = feed_info.get("zone", "")
+    matcher = profile.matcher if profile else get_keyword_matcher()
+    filtered_articles = []
+    all_meaningful_phrases = []
+    duplicate_count = 0
+    
+    candidates = []
+    for entry in entries:
+        if is_article_duplicate(entry['hash'], pushed_articles, today):
+            duplicate_count += 1
+            continue
+        candidates.append((entry, entry['title'] + " " + entry['summary']))
+    
+    with profile_stage("phrases"):
+        for entry, text in candidates:
+            all_meaningful_phrases.extend(extract_meaningful_phrases(text, matcher))
+    
+    with profile_stage("score"):
+        for entry, text in candidates:
+            if not has_core_keywords(text, matcher):
+                continue
+            title = entry['title']
+            priority_score, core_matches, aux_matches, zone_weight = calculate_priority_score(text, feed_zone, profile)
+            chinese_title = translate_to_chinese(title) if translate else title
+            article_info = {
+                'title': title,
+                'chinese_title': chinese_title,
+                'link': entry['link'],
+                'hash': entry['hash'],
+                'priority_score': priority_score,
+                'core_matches': core_matches,
+                'aux_matches': aux_matches,
+                'zone': feed_zone,
+                'zone_weight': zone_weight,
+                'source': feed_title,
+                'source_type': feed_info.get('source', 'unknown'),
+                'text': text,
+                'pub_date': entry['pub_date'] or "未知日期"
+            }
+            filtered_articles.append(article_info)
+    
+    if entries:
+        label = f"[{profile.name}] " if profile and profile.name != DEFAULT_PROFILE_NAME else ""
+        print(f"[INFO] ✅ {label}共{len(entries)}篇，筛选{len(filtered_articles)}条核心匹配，跳过{duplicate_count}条重复")
+    return filtered_articles, all_meaningful_phrases
 
 def format_article_for_push(article, index):
     source_name = article.get('source', 'Unknown')
@@ -787,7 +1837,240 @@ def format_article_for_push(article, index):
     result += f"\n🏛️ 来源: {source_name}{zone_display}\n📅 日期: {pub_date}\n🔗 链接: {article['link']}"
     return result
 
-def find_historical_articles(pushed_articles, push_schedule, today, needed_count):
+# ==================== 近似重复检测 ====================
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 32            # 32个band×2行，相似度约0.2以上的文章大多会落入同一桶，再逐对精确比较
+NEAR_DUPLICATE_THRESHOLD = 0.5
+# 新闻稿换了标题、只引用摘要中的几句：按较短一方的摘要被另一方覆盖的比例判断
+NEAR_DUPLICATE_CONTAINMENT = 0.6
+NEAR_DUPLICATE_MIN_SHINGLES = 20       # 摘要太短时重合比例不可靠，只按全文Jaccard判断
+_MINHASH_PRIME = (1 << 61) - 1
+_MINHASH_SEEDS = [(random.Random(i).randrange(1, _MINHASH_PRIME), random.Random(-i - 1).randrange(0, _MINHASH_PRIME))
+                  for i in range(MINHASH_PERMUTATIONS)]
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_HTML_BLOCK_TAG_RE = re.compile(r'</?(?:p|br|div|li|tr|h\d)\b[^>]*>', re.I)
+# 出版商在摘要里附带的元数据行（ScienceDirect、Wiley等），同一期的文章几乎完全相同
+_RSS_METADATA_LINE_RE = re.compile(r'^\s*(?:publication date|source|author\(s\)|authors?|available online|published|journal|doi)\s*:.*$',
+                                   re.I | re.M)
+_RSS_CITATION_RE = re.compile(r'\b(?:volume|vol\.|issue|pages?|article)\s+[\w.]*\d[\w.–-]*|\bin press,? corrected proof\b|\bdoi:\s*\S+|\b10\.\d{4,9}/\S+',
+                              re.I)
+
+def _shingles(text):
+    """标题+摘要去标签、去出版商元数据、去标点后取相邻词对"""
+    text = _HTML_TAG_RE.sub(' ', _HTML_BLOCK_TAG_RE.sub('\n', text))
+    text = _RSS_CITATION_RE.sub(' ', _RSS_METADATA_LINE_RE.sub(' ', text)).lower()
+    words = _WHITESPACE_RE.sub(' ', _PUNCTUATION_RE.sub(' ', text)).split()
+    if len(words) < 2:
+        return set(words)
+    return {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+def minhash_signature(shingles):
+    hashes = [int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+              for shingle in shingles]
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _MINHASH_PRIME for h in hashes) for a, b in _MINHASH_SEEDS)
+
+def _summary_text(article):
+    """打分文本是“标题 摘要”，去掉标题部分得到摘要"""
+    text = article.get('text') or ''
+    title = article['title']
+    return text[len(title):] if text.startswith(title) else text
+
+def is_near_duplicate(shingles_a, summary_a, shingles_b, summary_b):
+    """全文词对Jaccard够高，或较短一方的摘要大部分出现在另一方摘要中（标题不同的新闻稿）"""
+    union = len(shingles_a | shingles_b)
+    if union and len(shingles_a & shingles_b) / union >= NEAR_DUPLICATE_THRESHOLD:
+        return True
+    shorter = min(len(summary_a), len(summary_b))
+    return shorter >= NEAR_DUPLICATE_MIN_SHINGLES and len(summary_a & summary_b) / shorter >= NEAR_DUPLICATE_CONTAINMENT
+
+def remove_near_duplicates(articles):
+    """同一成果在期刊源和新闻源（Eos、AGU News等）标题链接不同：按MinHash/LSH找候选对，精确比较后聚类，每簇只保留分区最高、分数最高的一篇
+
+    只合并来自不同源的文章，同一源的两篇永远不在同一簇里（同一期刊同一期的文章摘要格式相近）
+    """
+    shingles = [_shingles(article.get('text') or article['title']) for article in articles]
+    summaries = [_shingles(_summary_text(article)) for article in articles]
+    signatures = [minhash_signature(article_shingles) for article_shingles in shingles]
+    parent = list(range(len(articles)))
+    cluster_sources = [{article.get('source', '')} for article in articles]
+    
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+    
+    # LSH：任一band完全相同才作为候选对，避免两两比较
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    buckets = {}
+    for i, signature in enumerate(signatures):
+        if signature is None:
+            continue
+        compared = set()
+        for band in range(MINHASH_BANDS):
+            key = (band, signature[band * rows:(band + 1) * rows])
+            for j in buckets.setdefault(key, []):
+                root_i, root_j = find(i), find(j)
+                if root_i == root_j or j in compared or not cluster_sources[root_i].isdisjoint(cluster_sources[root_j]):
+                    continue
+                compared.add(j)
+                if is_near_duplicate(shingles[i], summaries[i], shingles[j], summaries[j]):
+                    parent[root_i] = root_j
+                    cluster_sources[root_j] |= cluster_sources[root_i]
+            buckets[key].append(i)
+    
+    clusters = {}
+    for i in range(len(articles)):
+        clusters.setdefault(find(i), []).append(i)
+    kept = []
+    removed = 0
+    for members in clusters.values():
+        best = max(members, key=lambda i: (articles[i].get('zone_weight', 0), articles[i]['priority_score'], -i))
+        kept.append(best)
+        removed += len(members) - 1
+    if removed:
+        print(f"[INFO] 🧬 近似重复文章合并: {removed} 篇")
+    return [articles[i] for i in sorted(kept)]
+
+class PushQueue:
+    """按文章hash索引的优先队列：O(log n) 插入去重，按分数取前K篇"""
+
+    def __init__(self, articles=None):
+        self._heap = []
+        self._entries = {}
+        # 同分时保持插入顺序，与原先稳定排序的结果一致
+        self._counter = itertools.count()
+        for article in articles or []:
+            self.push(article)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, article_hash):
+        return article_hash in self._entries
+
+    def hashes(self):
+        return set(self._entries)
+
+    def push(self, article):
+        """加入文章；hash已存在时忽略并返回False"""
+        article_hash = article['hash']
+        if article_hash in self._entries:
+            return False
+        entry = (-article['priority_score'], next(self._counter), article)
+        self._entries[article_hash] = entry
+        heapq.heappush(self._heap, entry)
+        return True
+
+    def pop_top(self, k):
+        """弹出分数最高的至多k篇文章"""
+        out = []
+        while self._heap and len(out) < k:
+            _, _, article = heapq.heappop(self._heap)
+            del self._entries[article['hash']]
+            out.append(article)
+        return out
+
+    def peek_top(self, k):
+        return [entry[2] for entry in heapq.nsmallest(k, self._heap)]
+
+    def to_list(self):
+        """按分数降序导出（用于保存推送计划）"""
+        return [entry[2] for entry in sorted(self._heap)]
+
+class CandidateLog:
+    """未推送候选文章的追加日志（JSONL），按hash索引，回补时一次查询即可取前N篇"""
+
+    def __init__(self, path=CANDIDATE_LOG_FILE):
+        self.path = path
+        self._candidates = {}
+        self._pushed = set()
+        self._record_count = 0
+        self._journal = CheckpointJournal(path)
+        if self._journal.exists():
+            for record in self._journal.read():
+                self._apply(record)
+        else:
+            self._import_legacy_backups()
+
+    def _apply(self, record):
+        self._record_count += 1
+        article_hash = record.get('hash')
+        if record.get('op') == 'add':
+            if article_hash not in self._pushed:
+                self._candidates.setdefault(article_hash, record)
+        elif record.get('op') == 'pushed':
+            self._pushed.add(article_hash)
+            self._candidates.pop(article_hash, None)
+
+    def _append(self, records):
+        if not records:
+            return
+        try:
+            self._journal.append(*records)
+            for record in records:
+                self._apply(record)
+        except Exception as e:
+            print(f"[ERROR] 写入候选文章日志失败: {e}")
+
+    def _import_legacy_backups(self):
+        """首次使用时从旧的 push_schedule_YYYY-MM-DD.json 全量备份导入候选文章"""
+        records = []
+        for i in range(BACKFILL_WINDOW_DAYS, 0, -1):
+            past_date = (datetime.datetime.now() - datetime.timedelta(days=i)).strftime("%Y-%m-%d")
+            filename = f"push_schedule_{past_date}.json"
+            if not os.path.exists(filename):
+                continue
+            try:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    history_data = json.load(f)
+                for article in history_data.get(past_date, []):
+                    records.append(self._add_record(past_date, article))
+            except Exception as e:
+                print(f"[WARN] 读取历史推送计划失败 {filename}: {e}")
+        if records:
+            print(f"[INFO] 📦 从旧备份导入 {len(records)} 条候选文章")
+            self._append(records)
+
+    @staticmethod
+    def _add_record(date, article):
+        # 'text' 只用于打分，回补推送用不到，不写入日志以保持紧凑
+        stored = {k: v for k, v in article.items() if k != 'text'}
+        return {'op': 'add', 'date': date, 'hash': article['hash'],
+                'score': article['priority_score'], 'article': stored}
+
+    def add(self, date, articles):
+        records = [self._add_record(date, a) for a in articles
+                   if a['hash'] not in self._candidates and a['hash'] not in self._pushed]
+        self._append(records)
+
+    def mark_pushed(self, date, hashes):
+        self._append([{'op': 'pushed', 'date': date, 'hash': h} for h in hashes if h not in self._pushed])
+
+    def top_unpushed(self, n, since, until, exclude=()):
+        """取 [since, until) 日期窗口内分数最高的n篇未推送文章，较新的日期同分优先"""
+        in_window = (r for r in self._candidates.values()
+                     if since <= r['date'] < until and r['hash'] not in exclude)
+        return [r['article'] for r in heapq.nlargest(n, in_window, key=lambda r: (r['score'], r['date']))]
+
+    def compact(self, cutoff):
+        """丢弃已推送及早于cutoff的记录；仅在无效记录占多数时重写文件"""
+        live = [r for r in self._candidates.values() if r['date'] >= cutoff]
+        if self._record_count <= 2 * len(live):
+            return
+        try:
+            self._journal.rewrite(live)
+            self._candidates = {r['hash']: r for r in live}
+            self._pushed = set()
+            self._record_count = len(live)
+            print(f"[INFO] 📦 候选文章日志已压缩，保留 {len(live)} 条")
+        except Exception as e:
+            print(f"[ERROR] 压缩候选文章日志失败: {e}")
+
+def find_historical_articles(pushed_articles, push_schedule, today, needed_count, scheduled_hashes=None, candidate_log=None):
     if needed_count <= 0:
         return []
     print(f"[INFO] 🔍 查找历史未推送文章，需要补充 {needed_count} 篇")
@@ -795,35 +2078,25 @@ def find_historical_articles(pushed_articles, push_schedule, today, needed_count
     for date_key in pushed_articles:
         for article_hash in pushed_articles[date_key]:
             pushed_hashes.add(article_hash)
-    scheduled_hashes = set()
-    if today in push_schedule:
-        for article in push_schedule[today]:
-            scheduled_hashes.add(article['hash'])
-    all_historical_articles = []
-    history_schedule_files = []
-    for i in range(1, 11):
-        past_date = (datetime.datetime.now() - datetime.timedelta(days=i)).strftime("%Y-%m-%d")
-        filename = f"push_schedule_{past_date}.json"
-        if os.path.exists(filename):
-            history_schedule_files.append((past_date, filename))
-    for date_str, filename in history_schedule_files:
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                history_data = json.load(f)
-                if date_str in history_data:
-                    for article in history_data[date_str]:
-                        if article['hash'] not in pushed_hashes and article['hash'] not in scheduled_hashes:
-                            all_historical_articles.append(article)
-        except Exception as e:
-            print(f"[WARN] 读取历史推送计划失败 {filename}: {e}")
-    if len(all_historical_articles) < needed_count:
-        for date_key in sorted(push_schedule.keys()):
-            if date_key < today:
-                for article in push_schedule[date_key]:
-                    if article['hash'] not in pushed_hashes and article['hash'] not in scheduled_hashes:
-                        all_historical_articles.append(article)
-    all_historical_articles = sorted(all_historical_articles, key=lambda x: x['priority_score'], reverse=True)
-    return all_historical_articles[:needed_count]
+    if scheduled_hashes is None:
+        scheduled_hashes = set()
+        if today in push_schedule:
+            for article in push_schedule[today]:
+                scheduled_hashes.add(article['hash'])
+    if candidate_log is None:
+        candidate_log = CandidateLog()
+    since = (datetime.datetime.strptime(today, "%Y-%m-%d") - datetime.timedelta(days=BACKFILL_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    excluded = pushed_hashes | scheduled_hashes
+    found = candidate_log.top_unpushed(needed_count, since, today, excluded)
+    if len(found) >= needed_count:
+        return found
+    candidates = PushQueue(found)
+    for date_key in sorted(push_schedule.keys()):
+        if date_key < today:
+            for article in push_schedule[date_key]:
+                if article['hash'] not in excluded:
+                    candidates.push(article)
+    return candidates.pop_top(needed_count)
 
 def get_top_meaningful_phrases(all_phrases, top_n=5):
     if not all_phrases:
@@ -834,20 +2107,426 @@ def get_top_meaningful_phrases(all_phrases, top_n=5):
     phrase_count = Counter(normalized_phrases)
     return phrase_count.most_common(top_n)
 
-def push_to_wechat(text):
-    print(f"[INFO] 📤 准备推送内容，长度为 {len(text)} 字符")
-    maxlen = 1800
-    for i in range(0, len(text), maxlen):
-        chunk = text[i:i+maxlen]
+TREND_RECENT_DAYS = 7
+TREND_BASELINE_DAYS = 30
+TREND_MIN_COUNT = 3           # 近7天至少出现这么多次才参与趋势判断
+TREND_MIN_RATIO = 1.5         # 近7天日均频次相对基线日均频次的最低倍数
+
+class PhraseTrendStore:
+    """逐日短语计数与7/30天滑动窗口合计：每天只加上当天的计数、减去滑出窗口那天的计数
+
+    存为追加日志（JSONL）：保存时只追加当天的计数和有变化的窗口合计，过期记录占多数时才整体重写
+    """
+
+    def __init__(self, path=PHRASE_TREND_FILE):
+        self.path = path
+        self.days = {}
+        self.windows = {TREND_RECENT_DAYS: {}, TREND_BASELINE_DAYS: {}}
+        self.starts = {TREND_RECENT_DAYS: None, TREND_BASELINE_DAYS: None}
+        self._record_count = 0
+        self._today = None
+        self._changed = {window: set() for window in self.windows}
+        self._needs_rewrite = False
+        self._journal = CheckpointJournal(path)
+        if self._journal.exists():
+            for record in self._journal.read():
+                self._load(record)
+            self._drop_expired_days()
+        else:
+            self._import_legacy()
+
+    def _load(self, record):
+        self._record_count += 1
+        if record.get('op') == 'day':
+            # 同一天重复运行时以最后一条为准
+            self.days[record['date']] = record['counts']
+        elif record.get('op') == 'totals':
+            for window, key in ((TREND_RECENT_DAYS, 'recent'), (TREND_BASELINE_DAYS, 'baseline')):
+                totals = self.windows[window]
+                for phrase, value in record.get(key, {}).items():
+                    if value > 0:
+                        totals[phrase] = value
+                    else:
+                        totals.pop(phrase, None)
+                self.starts[window] = record.get(f'{key}_start', self.starts[window])
+
+    def _import_legacy(self):
+        """首次使用时从旧的整份JSON（phrase_trends.json）导入，下次保存时写成日志"""
+        legacy_path = os.path.splitext(self.path)[0] + ".json"
+        if not os.path.exists(legacy_path):
+            return
         try:
-            response = requests.post(WECHAT_WEBHOOK, json={"msgtype": "text", "text": {"content": chunk}})
-            print(f"[INFO] 微信推送响应: {response.text}")
-            if response.status_code != 200:
-                print(f"[ERROR] 推送失败，状态码: {response.status_code}")
+            with open(legacy_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
         except Exception as e:
-            print(f"[ERROR] 推送到微信时出错: {e}")
+            print(f"[WARN] 读取短语趋势失败，重新累计: {e}")
+            return
+        self.days = data.get('days', {})
+        self.windows = {TREND_RECENT_DAYS: data.get('recent', {}), TREND_BASELINE_DAYS: data.get('baseline', {})}
+        self.starts = {TREND_RECENT_DAYS: data.get('recent_start'), TREND_BASELINE_DAYS: data.get('baseline_start')}
+        self._needs_rewrite = True
+
+    def _drop_expired_days(self):
+        baseline_cutoff = self.starts[TREND_BASELINE_DAYS]
+        for date in [d for d in self.days if baseline_cutoff and d < baseline_cutoff]:
+            del self.days[date]
+
+    def _apply(self, window, counts, sign):
+        totals = self.windows[window]
+        self._changed[window].update(counts)
+        for phrase, count in counts.items():
+            value = totals.get(phrase, 0) + sign * count
+            if value > 0:
+                totals[phrase] = value
+            else:
+                totals.pop(phrase, None)
+
+    def update(self, today, phrases):
+        """记录今天的短语；同一天重复运行时先撤销上次的计数"""
+        counts = Counter(p.strip() for p in phrases if p and len(p.strip()) >= 4)
+        previous = self.days.get(today)
+        for window in self.windows:
+            if previous:
+                self._apply(window, previous, -1)
+            self._apply(window, counts, 1)
+        self.days[today] = dict(counts)
+        self._today = today
+        
+        current_date = datetime.datetime.strptime(today, "%Y-%m-%d")
+        for window in self.windows:
+            cutoff = (current_date - datetime.timedelta(days=window - 1)).strftime("%Y-%m-%d")
+            start = self.starts[window] or cutoff
+            if start < cutoff:
+                # 只遍历滑出窗口的那几天
+                for date in [d for d in self.days if start <= d < cutoff]:
+                    self._apply(window, self.days[date], -1)
+            self.starts[window] = max(start, cutoff)
+        self._drop_expired_days()
+
+    def _totals_record(self, phrases_by_window):
+        record = {'op': 'totals'}
+        for window, key in ((TREND_RECENT_DAYS, 'recent'), (TREND_BASELINE_DAYS, 'baseline')):
+            totals = self.windows[window]
+            # 0 表示该短语已移出窗口合计
+            record[key] = {phrase: totals.get(phrase, 0) for phrase in phrases_by_window[window]}
+            record[f'{key}_start'] = self.starts[window]
+        return record
 
-def get_rss_status_summary(rss_status, total_feeds):
+    def save(self):
+        day_records = [{'op': 'day', 'date': self._today, 'counts': self.days[self._today]}] if self._today in self.days else []
+        live = len(self.days) + 1
+        if self._needs_rewrite or self._record_count + len(day_records) + 1 > 2 * live:
+            records = [{'op': 'day', 'date': date, 'counts': self.days[date]} for date in sorted(self.days)]
+            records.append(self._totals_record(self.windows))
+            self._journal.rewrite(records)
+            self._record_count = len(records)
+            self._needs_rewrite = False
+        else:
+            self._journal.append(*day_records, self._totals_record(self._changed))
+            self._record_count += len(day_records) + 1
+        self._changed = {window: set() for window in self.windows}
+        self._today = None
+
+    def rising(self, today, top_n=5):
+        """近7天日均频次明显高于此前23天日均频次的短语，返回 [(短语, 近7天次数, 倍数)]"""
+        recent_start = self.starts[TREND_RECENT_DAYS] or today
+        recent_days = sum(1 for d in self.days if d >= recent_start)
+        baseline_days = len(self.days) - recent_days
+        if not baseline_days:
+            return []
+        recent = self.windows[TREND_RECENT_DAYS]
+        baseline = self.windows[TREND_BASELINE_DAYS]
+        results = []
+        for phrase, count in recent.items():
+            if count < TREND_MIN_COUNT:
+                continue
+            recent_rate = count / recent_days
+            baseline_rate = (baseline.get(phrase, 0) - count) / baseline_days
+            # 加1平滑：基线从未出现的短语不会得到无穷大的倍数
+            ratio = (recent_rate + 1) / (baseline_rate + 1)
+            if ratio >= TREND_MIN_RATIO:
+                results.append((phrase, count, round(ratio, 1)))
+        results.sort(key=lambda item: (-item[2], -item[1]))
+        return results[:top_n]
+
+def format_rising_phrases(rising):
+    if not rising:
+        return ""
+    content = "\n\n📈 上升趋势短语（近7天 vs 基线）："
+    for i, (phrase, count, ratio) in enumerate(rising, 1):
+        content += f"\n⬆️ {i}. {phrase}: {count}次 (×{ratio})"
+    return content
+
+class TokenBucket:
+    """令牌桶限速：rate为每秒补充的令牌数，capacity为突发上限"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_time = (1 - self.tokens) / self.rate
+            time.sleep(wait_time)
+
+_WEBHOOK_BUCKETS = {}
+_WEBHOOK_BUCKETS_LOCK = threading.Lock()
+
+def webhook_bucket(webhook, rate_per_minute=WECHAT_RATE_LIMIT_PER_MINUTE):
+    """同一webhook的所有发送队列共用一个令牌桶；容量为1，任意60秒内最多 rate_per_minute 条"""
+    with _WEBHOOK_BUCKETS_LOCK:
+        if webhook not in _WEBHOOK_BUCKETS:
+            _WEBHOOK_BUCKETS[webhook] = TokenBucket(rate_per_minute / 60.0, 1)
+        return _WEBHOOK_BUCKETS[webhook]
+
+def _split_by_bytes(text, max_bytes):
+    pieces = []
+    current = ""
+    current_bytes = 0
+    for char in text:
+        char_bytes = len(char.encode('utf-8'))
+        if current_bytes + char_bytes > max_bytes:
+            pieces.append(current)
+            current, current_bytes = "", 0
+        current += char
+        current_bytes += char_bytes
+    if current:
+        pieces.append(current)
+    return pieces
+
+def split_message_by_bytes(text, max_bytes=WECHAT_MAX_MESSAGE_BYTES):
+    """按文章/段落边界切分消息，每条的UTF-8字节数不超过max_bytes"""
+    blocks = []
+    previous_line = None
+    for line in text.split("\n"):
+        # 每篇文章（📄开头）或空行后的新段落各自成块，尽量不把一篇文章拆到两条消息里
+        if not blocks or line.startswith("📄 ") or previous_line == "":
+            blocks.append([line])
+        else:
+            blocks[-1].append(line)
+        previous_line = line
+    chunks = []
+    current = ""
+    for block in ("\n".join(lines) for lines in blocks):
+        candidate = f"{current}\n{block}" if current else block
+        if len(candidate.encode('utf-8')) <= max_bytes:
+            current = candidate
+            continue
+        if current:
+            chunks.append(current)
+        if len(block.encode('utf-8')) <= max_bytes:
+            current = block
+        else:
+            pieces = _split_by_bytes(block, max_bytes)
+            chunks.extend(pieces[:-1])
+            current = pieces[-1]
+    if current:
+        chunks.append(current)
+    return [c.strip("\n") for c in chunks if c.strip()]
+
+class WeChatPushSender:
+    """企业微信推送队列：后台线程按序发送，令牌桶限速，失败退避重试，不阻塞主流程"""
+
+    def __init__(self, webhook=None, rate_per_minute=WECHAT_RATE_LIMIT_PER_MINUTE,
+                 max_retries=WECHAT_PUSH_RETRIES, timeout=WECHAT_PUSH_TIMEOUT):
+        self.webhook = webhook or WECHAT_WEBHOOK
+        self.bucket = webhook_bucket(self.webhook, rate_per_minute)
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.sent = 0
+        self.failed = 0
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+
+    def submit(self, text):
+        chunks = split_message_by_bytes(text)
+        print(f"[INFO] 📤 准备推送内容，长度为 {len(text)} 字符，分 {len(chunks)} 条消息")
+        for chunk in chunks:
+            self._queue.put(chunk)
+
+    def _worker(self):
+        while True:
+            chunk = self._queue.get()
+            try:
+                if chunk is None:
+                    return
+                self._send(chunk)
+            finally:
+                self._queue.task_done()
+
+    def _send(self, chunk):
+        import requests
+        error = None
+        for attempt in range(self.max_retries):
+            self.bucket.acquire()
+            retry_after = 2 ** attempt
+            try:
+                response = requests.post(self.webhook, json={"msgtype": "text", "text": {"content": chunk}},
+                                         timeout=self.timeout)
+                try:
+                    errcode = response.json().get('errcode', 0)
+                except ValueError:
+                    errcode = 0
+                if response.status_code == 200 and errcode == 0:
+                    print(f"[INFO] 微信推送响应: {response.text}")
+                    self.sent += 1
+                    return True
+                error = f"状态码: {response.status_code}, 响应: {response.text[:200]}"
+                # 45009：接口调用超过频率限制，等到下一分钟窗口再试
+                if errcode == 45009 or response.status_code == 429:
+                    retry_after = max(retry_after, WECHAT_RATE_LIMITED_WAIT)
+                elif errcode not in WECHAT_TRANSIENT_ERRCODES and response.status_code < 500:
+                    print(f"[ERROR] 推送失败（不可重试的错误）: {error}")
+                    self.failed += 1
+                    return False
+            except Exception as e:
+                error = str(e)
+            if attempt < self.max_retries - 1:
+                print(f"[WARN] 微信推送第{attempt+1}次失败，{retry_after}秒后重试: {error}")
+                time.sleep(retry_after)
+        print(f"[ERROR] 推送失败（已重试{self.max_retries}次）: {error}")
+        self.failed += 1
+        return False
+
+    def close(self, timeout=None):
+        """等待队列中的消息发送完毕后停止后台线程"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print(f"[WARN] 推送队列未在 {timeout} 秒内发送完毕，剩余消息已放弃")
+
+def push_to_wechat(text, sender=None):
+    """提交到推送队列；未给出sender时同步发送完毕后返回"""
+    if sender is not None:
+        sender.submit(text)
+        return
+    sender = WeChatPushSender()
+    sender.submit(text)
+    sender.close()
+
+def is_host_failure(status_entry):
+    """rss_status 中的失败记录是否应计入主机级熔断"""
+    status = status_entry.get('status')
+    if status in ('timeout', 'connection_error'):
+        return True
+    if status == 'http_error':
+        code = status_entry.get('http_status')
+        return code is None or code == 429 or code >= 500
+    return False
+
+class FeedCircuitBreaker:
+    """按源、按主机的熔断器，状态保存在 rss_status[url]['breaker'] 中跨运行延续"""
+
+    def __init__(self, rss_status, today, feed_urls=None, probe_owner=None):
+        """feed_urls 为当前完整的源列表（分片模式下也是全部源），只有其中的源参与主机级判断；
+        probe_owner(url) 判断本进程是否负责该源，分片模式下每台熔断主机只由一个worker探测"""
+        self.rss_status = rss_status
+        self.today = today
+        self.skipped = []
+        self.tripped_hosts = set()
+        self._states = {}
+        self._host_streak = {}
+        self._host_probes = set()
+        # allow() 与 record() 都在主线程中调用
+        self._lock = threading.Lock()
+        host_feeds = {}
+        for url, entry in rss_status.items():
+            self._states[url] = (entry or {}).get('breaker') or {}
+        for url in (rss_status if feed_urls is None else feed_urls):
+            host_feeds.setdefault(urlparse(url).netloc, []).append(url)
+        # 历史上整台主机的（当前仍在列表中的）源都已熔断：本次只放行一个源做探测
+        for host, urls in host_feeds.items():
+            opened = sum(1 for url in urls if (self._states.get(url) or {}).get('state') == 'open')
+            if opened >= HOST_TRIP_MIN_FEEDS and opened == len(urls):
+                self.tripped_hosts.add(host)
+                if probe_owner is None or probe_owner(min(urls)):
+                    self._host_probes.add(host)
+
+    def allow(self, feed_url):
+        """返回 'closed'（正常抓取）、'half_open'（单次探测）或 None（跳过并计数）"""
+        with self._lock:
+            return self._allow(feed_url)
+
+    def blocked(self, feed_url):
+        """不改变状态地判断 allow() 是否会跳过该源，供调度器在排队时直接丢弃"""
+        with self._lock:
+            host = urlparse(feed_url).netloc
+            if host in self.tripped_hosts:
+                return host not in self._host_probes
+            state = self._states.get(feed_url) or {}
+            return state.get('state') == 'open' and state.get('next_probe', '') > self.today
+
+    def _allow(self, feed_url):
+        host = urlparse(feed_url).netloc
+        if host in self.tripped_hosts:
+            if host in self._host_probes:
+                self._host_probes.discard(host)
+                return 'half_open'
+            self.skipped.append((feed_url, 'host'))
+            return None
+        state = self._states.get(feed_url) or {}
+        if state.get('state') != 'open':
+            return 'closed'
+        if state.get('next_probe', '') <= self.today:
+            return 'half_open'
+        self.skipped.append((feed_url, 'feed'))
+        return None
+
+    def record(self, feed_url):
+        with self._lock:
+            self._record(feed_url)
+
+    def _record(self, feed_url):
+        host = urlparse(feed_url).netloc
+        entry = self.rss_status.get(feed_url) or {}
+        status = entry.get('status')
+        if status == 'success':
+            state = {'state': 'closed', 'failures': 0}
+            self._host_streak[host] = 0
+            if host in self.tripped_hosts:
+                self.tripped_hosts.discard(host)
+                print(f"[INFO] 🔌 主机 {host} 探测成功，解除熔断")
+        else:
+            failures = (self._states.get(feed_url) or {}).get('failures', 0) + 1
+            if failures >= BREAKER_FAILURE_THRESHOLD:
+                backoff = min(2 ** (failures - BREAKER_FAILURE_THRESHOLD), BREAKER_MAX_BACKOFF_DAYS)
+                next_probe = (datetime.datetime.strptime(self.today, "%Y-%m-%d") + datetime.timedelta(days=backoff)).strftime("%Y-%m-%d")
+                state = {'state': 'open', 'failures': failures, 'next_probe': next_probe}
+                print(f"[WARN] ⚡ 连续失败{failures}次，熔断该源，{next_probe} 再探测")
+            else:
+                state = {'state': 'closed', 'failures': failures}
+            # 只有超时、连接错误、5xx和429说明主机吃力；404/410等只是单个源失效，与限速器的判断一致
+            if is_host_failure(entry):
+                self._host_streak[host] = self._host_streak.get(host, 0) + 1
+                if self._host_streak[host] >= HOST_TRIP_MIN_FEEDS and host not in self.tripped_hosts:
+                    self.tripped_hosts.add(host)
+                    print(f"[WARN] ⚡ 主机 {host} 连续{self._host_streak[host]}个源失败，本次运行跳过该主机其余源")
+            elif status in ('empty', 'http_error'):
+                # 主机正常作答，连续失败计数中断
+                self._host_streak[host] = 0
+        self._states[feed_url] = state
+        if feed_url in self.rss_status:
+            self.rss_status[feed_url]['breaker'] = state
+
+    def summary(self):
+        return {
+            'open': len([s for s in self._states.values() if s.get('state') == 'open']),
+            'skipped': len(self.skipped),
+            'tripped_hosts': sorted(self.tripped_hosts)
+        }
+
+def get_rss_status_summary(rss_status, total_feeds, breaker=None, breaker_summary=None):
     success = len([s for s in rss_status.values() if s.get('status') == 'success'])
     failed = total_feeds - success
     zone_stats = {}
@@ -855,17 +2534,291 @@ def get_rss_status_summary(rss_status, total_feeds):
         if status.get('status') == 'success':
             zone = status.get('zone', '未知')
             zone_stats[zone] = zone_stats.get(zone, 0) + 1
+    if breaker_summary is None:
+        breaker_summary = breaker.summary() if breaker else {'open': 0, 'skipped': 0, 'tripped_hosts': []}
     return {
         'total': total_feeds,
         'success': success,
         'failed': failed,
         'success_rate': round((success / total_feeds * 100) if total_feeds > 0 else 0, 1),
-        'zone_stats': zone_stats
+        'zone_stats': zone_stats,
+        'breaker_open': breaker_summary['open'],
+        'breaker_skipped': breaker_summary['skipped'],
+        'tripped_hosts': breaker_summary['tripped_hosts']
+    }
+
+def print_status_report():
+    """只读取本地状态文件打印运行状态，不发起网络请求"""
+    rss_status = load_rss_status()
+    push_schedule = load_push_schedule()
+    status_counts = Counter(entry.get('status') for entry in rss_status.values())
+    open_feeds = [url for url, entry in rss_status.items() if (entry.get('breaker') or {}).get('state') == 'open']
+    print(f"[INFO] 📊 RSS源状态: 共{len(rss_status)}个 " + ", ".join(f"{k}({v})" for k, v in status_counts.most_common()))
+    catalog = get_journal_catalog(JOURNAL_RSS_FILE) if os.path.exists(JOURNAL_RSS_FILE) else JournalCatalog()
+    print(f"[INFO] ⚡ 熔断中: {len(open_feeds)} 个源")
+    for url in open_feeds[:20]:
+        breaker_state = rss_status[url]['breaker']
+        row = catalog.find_by_feed(url)
+        journal = f"{catalog.title[row]}{f'[{catalog.zone[row]}]' if catalog.zone[row] else ''} " if row is not None else ""
+        print(f"  - {journal}{url} 连续失败{breaker_state.get('failures')}次，{breaker_state.get('next_probe')} 再探测")
+    if len(catalog):
+        publishers = sorted(catalog.by_publisher.items(), key=lambda item: -len(item[1]))
+        print(f"[INFO] 🏛️ 期刊目录: {len(catalog)} 种，RSS源 {len(catalog.by_feed)} 个，出版商: " + ", ".join(f"{name}({len(rows)})" for name, rows in publishers[:8]))
+    print(f"[INFO] 📋 推送队列: {sum(len(v) for v in push_schedule.values())} 篇待推送")
+    if os.path.exists(FETCH_CHECKPOINT_FILE):
+        print(f"[INFO] ♻️ 存在未完成的抓取检查点: {FETCH_CHECKPOINT_FILE}")
+    if os.path.exists(JOURNAL_RSS_FILE + ".journal"):
+        print(f"[INFO] ♻️ 存在未完成的RSS源发现检查点: {JOURNAL_RSS_FILE}.journal")
+
+# ==================== 分片执行 ====================
+
+SHARD_VIRTUAL_NODES = 160     # 每个worker在哈希环上的虚拟节点数，节点越多分配越均匀
+
+class HashRing:
+    """按RSS源URL的一致性哈希：增减worker时只有约 1/N 的源换分片"""
+
+    def __init__(self, num_workers, vnodes=SHARD_VIRTUAL_NODES):
+        self._points = sorted((self._hash(f"worker-{w}#{v}"), w) for w in range(num_workers) for v in range(vnodes))
+        self._keys = [point for point, _ in self._points]
+
+    @staticmethod
+    def _hash(key):
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def owner(self, key):
+        index = bisect.bisect(self._keys, self._hash(key)) % len(self._keys)
+        return self._points[index][1]
+
+def _shard_path(today, worker_id, num_workers):
+    return os.path.join(RunCache(today).run_dir, "shards", f"worker_{worker_id}_of_{num_workers}.json")
+
+def run_shard_worker(worker_id, num_workers):
+    """worker模式：只抓取、打分分到本分片的源，结果写入分片文件，由协调进程合并后推送"""
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    print(f"[INFO] 🧩 分片worker {worker_id}/{num_workers} 启动")
+    ring = HashRing(num_workers)
+    all_feeds = load_all_feeds()
+    rss_feeds = [feed for feed in all_feeds if ring.owner(feed['url']) == worker_id]
+    print(f"[INFO] 🧩 本分片负责 {len(rss_feeds)} 个RSS源")
+    profiles = load_profiles()
+    rss_status = load_rss_status()
+    states = load_profile_states(profiles, today)
+    shard_path = _shard_path(today, worker_id, num_workers)
+    os.makedirs(os.path.dirname(shard_path), exist_ok=True)
+    # rss_status.json 只由协调进程写入，worker把本分片的状态随结果一起交回
+    breaker = fetch_and_score(rss_feeds, profiles, states, rss_status, today,
+                              checkpoint_path=shard_path.replace(".json", ".checkpoint.jsonl"), save_status=False,
+                              all_feed_urls=[feed['url'] for feed in all_feeds],
+                              probe_owner=lambda url: ring.owner(url) == worker_id)
+    atomic_write_json(shard_path, {
+        'date': today,
+        'worker_id': worker_id,
+        'num_workers': num_workers,
+        'rss_status': {feed['url']: rss_status[feed['url']] for feed in rss_feeds if feed['url'] in rss_status},
+        'breaker': breaker.summary(),
+        'results': {name: {'articles': state['articles'], 'phrases': state['phrases']} for name, state in states.items()}
+    }, indent=None)
+    print(f"[INFO] ✅ 分片结果已写入 {shard_path}")
+
+def run_local_workers(num_workers):
+    """在本机启动 num_workers 个worker子进程（共享当前状态目录）并等待全部结束"""
+    import subprocess
+    script = os.path.abspath(__file__)
+    extra = ["--http2"] if _HTTP2_TRANSPORT is not None else []
+    processes = [subprocess.Popen([sys.executable, script, "--worker-id", str(worker_id), "--num-workers", str(num_workers)] + extra)
+                 for worker_id in range(num_workers)]
+    for worker_id, process in enumerate(processes):
+        if process.wait() != 0:
+            print(f"[WARN] 分片worker {worker_id} 退出码 {process.returncode}")
+
+def coordinate_shards(num_workers, rss_feeds, today, current_time):
+    """协调模式：合并各分片的候选文章、短语与rss_status，再统一选择和推送"""
+    profiles = load_profiles()
+    rss_status = load_rss_status()
+    states = load_profile_states(profiles, today)
+    skipped = 0
+    tripped_hosts = set()
+    merged = 0
+    for worker_id in range(num_workers):
+        shard_path = _shard_path(today, worker_id, num_workers)
+        try:
+            with open(shard_path, 'r', encoding='utf-8') as f:
+                shard = json.load(f)
+        except Exception as e:
+            print(f"[WARN] 缺少分片 {worker_id} 的结果，本次不含该分片: {e}")
+            continue
+        merged += 1
+        rss_status.update(shard.get('rss_status', {}))
+        skipped += shard.get('breaker', {}).get('skipped', 0)
+        tripped_hosts.update(shard.get('breaker', {}).get('tripped_hosts', []))
+        for name, result in shard.get('results', {}).items():
+            if name not in states:
+                continue
+            state = states[name]
+            state['articles'].extend(article for article in result.get('articles', [])
+                                     if not is_article_duplicate(article['hash'], state['pushed_articles'], today))
+            state['phrases'].extend(result.get('phrases', []))
+    print(f"[INFO] 🧩 已合并 {merged}/{num_workers} 个分片")
+    save_rss_status(rss_status)
+    save_score_stage(states, today)
+    
+    breaker_summary = {
+        'open': len([url for url, entry in rss_status.items() if ((entry or {}).get('breaker') or {}).get('state') == 'open']),
+        'skipped': skipped,
+        'tripped_hosts': sorted(tripped_hosts)
     }
+    rss_summary = get_rss_status_summary(rss_status, len(rss_feeds), breaker_summary=breaker_summary)
+    print(f"\n[INFO] 🔄 第四步：准备推送...")
+    push_all_profiles(profiles, states, rss_summary, today, current_time)
 
-def main():
+def print_search_results(query, limit=20):
+    """在本地全文索引中检索，不联网"""
+    if not os.path.exists(ARTICLE_INDEX_FILE):
+        print(f"[WARN] 全文索引不存在: {ARTICLE_INDEX_FILE}（正常运行一次后生成）")
+        return
+    article_index = ArticleIndex()
+    try:
+        results = article_index.search(query, limit)
+        print(f"[INFO] 🔎 “{query}” 命中 {len(results)} 篇（索引共 {article_index.count()} 篇）")
+        for i, (title, link, journal, zone, pub_date, seen_date, _) in enumerate(results, 1):
+            zone_info = f"[{zone}]" if zone else ""
+            print(f"  {i}. {title}\n     🏛️ {journal}{zone_info} 📅 {pub_date or seen_date}\n     🔗 {link}")
+    finally:
+        article_index.close()
+
+def replay_run(run_date, from_stage="parse"):
+    """从 runs/<日期>/ 的缓存重跑下游阶段：不联网、不推送、不写推送历史，只打印将要推送的文章"""
+    run_cache = RunCache(run_date)
+    if not run_cache.exists():
+        print(f"[ERROR] 未找到 {run_date} 的运行缓存: {run_cache.run_dir}")
+        return
+    profiles = load_profiles()
+    print(f"[INFO] ♻️ 从缓存重跑 {run_date}，起始阶段: {from_stage}")
+    start_time = time.time()
+    
+    scored = run_cache.load_stage("score") if from_stage == "select" else None
+    if scored is None:
+        parsed = run_cache.load_stage("parse") if from_stage in ("score", "select") else None
+        if parsed is None:
+            parsed = []
+            for feed_info, content in run_cache.iter_raw():
+                parsed.append({'feed': feed_info, 'entries': parse_feed_payload(content, feed_info, run_date)})
+            run_cache.save_stage("parse", parsed)
+            print(f"[INFO] 📄 解析阶段: {len(parsed)} 个源，{sum(len(item['entries']) for item in parsed)} 篇条目")
+        
+        scored = {}
+        for profile in profiles:
+            # 当天及之后推送的文章不算重复，否则重放结果会被原先的推送记录吃掉
+            history = {date: hashes for date, hashes in load_pushed_articles(profile.history_file).items() if date < run_date}
+            articles = []
+            phrases = []
+            for item in parsed:
+                feed_articles, feed_phrases = score_feed_entries(item['entries'], item['feed'], run_date, history, profile, translate=False)
+                articles.extend(feed_articles)
+                phrases.extend(feed_phrases)
+            scored[profile.name] = {'articles': articles, 'phrases': phrases}
+        run_cache.save_stage("score", scored)
+    
+    for profile in profiles:
+        result = scored.get(profile.name)
+        if result is None:
+            print(f"[WARN] 缓存中没有配置 {profile.name} 的打分结果，请使用 --from-stage score")
+            continue
+        push_queue = PushQueue(remove_near_duplicates(result['articles']))
+        print(f"\n[INFO] 🎯 【{profile.title}】候选 {len(push_queue)} 篇")
+        for batch_no in (1, 2):
+            batch = push_queue.pop_top(MAX_PUSH_PER_BATCH)
+            if not batch:
+                break
+            print(f"[INFO] 📋 第{batch_no}批次 ({len(batch)}/{MAX_PUSH_PER_BATCH}):")
+            for i, article in enumerate(batch, 1):
+                zone_info = f"[{article['zone']}]" if article['zone'] else "[无分区]"
+                print(f"  {i}. {article['title'][:60]}... {zone_info} (分数:{article['priority_score']})")
+        top_phrases = get_top_meaningful_phrases(result['phrases'], 5)
+        if top_phrases:
+            print("[INFO] 🔥 热点短语: " + ", ".join(f"{phrase}({count})" for phrase, count in top_phrases))
+    print(f"\n[INFO] ✅ 重跑完成，用时 {time.time() - start_time:.1f} 秒（未推送）")
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="地学期刊RSS聚合与筛选推送")
+    parser.add_argument("--status", action="store_true",
+                        help="只打印本地运行状态（RSS源、熔断、队列、检查点）后退出，不联网")
+    parser.add_argument("--resume-discovery", action="store_true",
+                        help="仅执行RSS源发现（从上次中断处继续），完成后退出")
+    parser.add_argument("--search", metavar="QUERY",
+                        help="在本地全文索引中检索近期文章（支持 \"短语\"、AND/OR/NOT），不联网")
+    parser.add_argument("--limit", type=int, default=20, help="--search 返回的最大条数")
+    parser.add_argument("--profile", action="store_true",
+                        help="用cProfile剖析各阶段，报告写入 runs/<日期>/profile/")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="用tracemalloc记录各阶段的内存峰值与主要分配位置")
+    parser.add_argument("--trace-frames", type=int, default=TRACEMALLOC_FRAMES,
+                        help="--trace-memory 每次分配记录的调用栈深度（默认1，加深会明显变慢）")
+    parser.add_argument("--profile-stages", default=None,
+                        help=f"只剖析指定阶段（逗号分隔，可选: {','.join(PROFILE_STAGES)}），默认全部")
+    parser.add_argument("--state-dir", default=None,
+                        help="运行时状态文件所在目录（分片模式下各进程共享），默认当前目录")
+    parser.add_argument("--worker-id", type=int, default=None,
+                        help="分片worker模式：只处理一致性哈希分到该编号的RSS源，结果交给 --coordinate 合并")
+    parser.add_argument("--num-workers", type=int, default=None, help="分片总数（配合 --worker-id / --coordinate）")
+    parser.add_argument("--coordinate", action="store_true",
+                        help="协调模式：合并当天各分片结果后选择并推送")
+    parser.add_argument("--local-workers", type=int, default=None,
+                        help="在本机启动N个分片进程抓取打分，结束后合并推送")
+    parser.add_argument("--from-stage", choices=PIPELINE_STAGES[1:4],
+                        help="不联网，从 runs/<日期>/ 的缓存重跑该阶段及之后的阶段（不推送）")
+    parser.add_argument("--run-date", default=None,
+                        help="配合 --from-stage 使用的运行日期（YYYY-MM-DD，默认今天）")
+    parser.add_argument("--http2", action="store_true",
+                        help=f"RSS抓取与源发现改用HTTP/2多路复用（需 httpx[http2]，也可设环境变量 {HTTP2_ENV}=1）")
+    args = parser.parse_args(argv)
+    if (args.worker_id is not None or args.coordinate) and not args.num_workers:
+        parser.error("--worker-id / --coordinate 需要同时指定 --num-workers")
+    if args.worker_id is not None and not 0 <= args.worker_id < args.num_workers:
+        parser.error("--worker-id 需在 0 到 num_workers-1 之间")
+    if args.profile_stages:
+        unknown = set(args.profile_stages.split(",")) - set(PROFILE_STAGES)
+        if unknown:
+            parser.error(f"未知的剖析阶段: {','.join(sorted(unknown))}")
+    if args.search is not None and not args.search.strip():
+        parser.error("--search 需要非空的检索词")
+    if args.trace_frames < 1:
+        parser.error("--trace-frames 至少为1")
+    if args.local_workers is not None and args.local_workers < 1:
+        parser.error("--local-workers 至少为1")
+    return args
+
+def main(args=None):
+    if args is None:
+        args = parse_args([])
+    if args.state_dir:
+        os.makedirs(args.state_dir, exist_ok=True)
+        os.chdir(args.state_dir)
+    if args.profile or args.trace_memory:
+        run_dir = RunCache(datetime.datetime.now().strftime("%Y-%m-%d")).run_dir
+        suffix = f"_worker{args.worker_id}" if args.worker_id is not None else ""
+        STAGE_PROFILER.configure(os.path.join(run_dir, "profile" + suffix), cpu=args.profile, memory=args.trace_memory,
+                                 stages=args.profile_stages.split(",") if args.profile_stages else None,
+                                 memory_frames=args.trace_frames)
+    if args.status:
+        print_status_report()
+        return
+    if args.search is not None:
+        print_search_results(args.search, args.limit)
+        return
+    if args.from_stage:
+        replay_run(args.run_date or datetime.datetime.now().strftime("%Y-%m-%d"), args.from_stage)
+        return
+    if args.http2 or os.getenv(HTTP2_ENV, "").strip() == "1":
+        enable_http2()
+    if args.worker_id is not None:
+        run_shard_worker(args.worker_id, args.num_workers)
+        return
     today = datetime.datetime.now().strftime("%Y-%m-%d")
     current_time = datetime.datetime.now().strftime("%H:%M:%S")
+    if args.coordinate:
+        coordinate_shards(args.num_workers, load_all_feeds(), today, current_time)
+        return
     
     print(f"\n[INFO] 🏔️ 折叠地层推送系统启动 [分区评分优化版 v2.0]")
     print(f"[INFO] 📅 日期: {today} ⏰ 时间: {current_time}")
@@ -874,16 +2827,23 @@ def main():
     print(f"[INFO] 🎯 分区权重: 1区(+50) 2区(+30) 3区(+20) 4区(+10)")
     
     print(f"\n[INFO] 🔄 第一步：更新期刊RSS源（仅在每周日执行）...")
-    rss_finder = RSSSourceFinder(timeout=12)
-
     # 是否强制更新（环境变量FORCE_RSS_UPDATE=1 可临时覆盖周日限制）
     force_update_flag = os.getenv("FORCE_RSS_UPDATE", "").strip() == "1"
     is_sunday = datetime.datetime.now().weekday() == WEEKLY_RSS_UPDATE_DAY
     
+    # 上次发现被30分钟超时打断时会留下检查点，后续运行无论星期几都继续处理剩余期刊
+    discovery_pending = os.path.exists(JOURNAL_RSS_FILE + ".journal")
+    
     should_update_rss = False
-    if force_update_flag:
+    if args.resume_discovery:
+        print("[INFO] ⚙️ --resume-discovery：仅执行RSS源发现（从检查点继续）")
+        should_update_rss = True
+    elif force_update_flag:
         print("[INFO] ⚠️ 环境变量 FORCE_RSS_UPDATE=1 已设置，本次将强制更新RSS源（忽略周日限制）")
         should_update_rss = True
+    elif discovery_pending:
+        print("[INFO] ♻️ 存在未完成的RSS源发现检查点，本次继续处理剩余期刊")
+        should_update_rss = True
     else:
         if is_sunday:
             # 周日执行：若今日尚未更新则执行
@@ -915,11 +2875,54 @@ def main():
     
     if should_update_rss:
         if os.path.exists(JOURNAL_LIST_FILE):
-            _ = rss_finder.update_journal_rss_sources(JOURNAL_LIST_FILE, JOURNAL_RSS_FILE)
+            rss_finder = RSSSourceFinder(timeout=12)
+            with profile_stage("discovery"):
+                _ = rss_finder.update_journal_rss_sources(JOURNAL_LIST_FILE, JOURNAL_RSS_FILE)
         else:
             print(f"[WARN] 期刊列表文件不存在: {JOURNAL_LIST_FILE}")
     
+    if args.resume_discovery:
+        print("[INFO] ✅ RSS源发现步骤结束，已退出（未执行抓取与推送）")
+        return
+    
     print(f"\n[INFO] 🔄 第二步：加载RSS源...")
+    rss_feeds = load_all_feeds()
+    
+    if args.local_workers:
+        print(f"\n[INFO] 🔄 第三步：启动 {args.local_workers} 个本地分片进程处理文章...")
+        run_local_workers(args.local_workers)
+        coordinate_shards(args.local_workers, rss_feeds, today, current_time)
+        return
+    
+    print(f"\n[INFO] 🔄 第三步：处理文章...")
+    profiles = load_profiles()
+    if len(profiles) > 1:
+        print(f"[INFO] 👥 关键词配置: {', '.join(p.name for p in profiles)}（共享同一次抓取与解析）")
+    rss_status = load_rss_status()
+    states = load_profile_states(profiles, today)
+    breaker = fetch_and_score(rss_feeds, profiles, states, rss_status, today)
+    
+    save_score_stage(states, today)
+    rss_summary = get_rss_status_summary(rss_status, len(rss_feeds), breaker)
+    if rss_summary['breaker_skipped']:
+        print(f"[INFO] ⚡ 熔断跳过 {rss_summary['breaker_skipped']} 个源，熔断中的主机: {', '.join(rss_summary['tripped_hosts']) or '无'}")
+    
+    print(f"\n[INFO] 🔄 第四步：准备推送...")
+    push_all_profiles(profiles, states, rss_summary, today, current_time)
+
+def save_score_stage(states, today):
+    """保存打分阶段产物并清理过期的运行目录；保留 'text' 以便重放时的近似去重与实际运行一致"""
+    try:
+        RunCache(today).save_stage("score", {name: {
+            'articles': state['articles'],
+            'phrases': state['phrases']
+        } for name, state in states.items()})
+        prune_run_caches(today)
+    except Exception as e:
+        print(f"[WARN] 保存运行缓存失败: {e}")
+
+def load_all_feeds():
+    """期刊RSS清单加上固定的新闻源"""
     rss_feeds = load_rss_feeds_from_csv(JOURNAL_RSS_FILE)
     additional_feeds = [
         {"url": "https://eos.org/feed", "title": "Eos", "source": "additional", "zone": ""},
@@ -939,88 +2942,226 @@ def main():
     print(f"[INFO] 📊 总共加载RSS源: {len(rss_feeds)} 个")
     print(f"[INFO] 📊 分区分布: {', '.join([f'{z}({c}个)' for z, c in sorted(zone_counts.items())])}")
     
-    print(f"\n[INFO] 🔄 第三步：处理文章...")
-    pushed_articles = load_pushed_articles()
-    push_schedule = load_push_schedule()
-    rss_status = load_rss_status()
-    clean_old_records(pushed_articles)
-    
-    if today not in push_schedule:
-        push_schedule[today] = []
+    return rss_feeds
+
+def load_profile_states(profiles, today):
+    """读取每个关键词配置的推送历史与推送队列"""
+    states = {}
+    for profile in profiles:
+        pushed_articles = load_pushed_articles(profile.history_file)
+        push_schedule = load_push_schedule(profile.schedule_file)
+        clean_old_records(pushed_articles)
+        if today not in push_schedule:
+            push_schedule[today] = []
+        states[profile.name] = {
+            'pushed_articles': pushed_articles,
+            'push_schedule': push_schedule,
+            'articles': [],
+            'phrases': []
+        }
     
-    all_articles = []
-    all_meaningful_phrases = []
+    return states
+
+def fetch_and_score(rss_feeds, profiles, states, rss_status, today, checkpoint_path=FETCH_CHECKPOINT_FILE, save_status=True,
+                    all_feed_urls=None, probe_owner=None):
+    """抓取、解析、打分阶段：结果累加到states中，返回本次的熔断器（分片模式下传入全部源与探测归属）"""
+    # 每处理完一个RSS源追加一条检查点；中断后重新运行时跳过已完成的源
+    fetch_checkpoint = CheckpointJournal(checkpoint_path)
+    completed_feeds = set()
+    for record in fetch_checkpoint.read():
+        feed_url = record.get('feed')
+        if record.get('status'):
+            rss_status[feed_url] = record['status']
+        if record.get('date') != today:
+            continue
+        completed_feeds.add(feed_url)
+        # 旧格式检查点只记录了默认配置的结果
+        results = record.get('results') or {DEFAULT_PROFILE_NAME: record}
+        for name, result in results.items():
+            if name not in states:
+                continue
+            state = states[name]
+            for article in result.get('articles', []):
+                if not is_article_duplicate(article['hash'], state['pushed_articles'], today):
+                    state['articles'].append(article)
+            state['phrases'].extend(result.get('phrases', []))
+    if completed_feeds:
+        print(f"[INFO] ♻️ 从检查点恢复 {len(completed_feeds)} 个已处理RSS源")
+    fetch_finished = False
+    breaker = FeedCircuitBreaker(rss_status, today, all_feed_urls or [feed['url'] for feed in rss_feeds], probe_owner)
     
     def process_timeout_handler(signum, frame):
         raise TimeoutError("处理超时")
     signal.signal(signal.SIGALRM, process_timeout_handler)
     signal.alarm(3600)  # 1小时
     
+    # 多个RSS源并发抓取，每台主机的并发数与请求间隔由 feed_throttle 按延迟和429/503反馈自动调整
+    feed_throttle = AdaptiveHostThrottle()
+    # 原始RSS内容按运行日期落盘，调整关键词或权重后可用 --from-stage 不联网重跑
+    run_cache = RunCache(today)
+    scoring_hash = scoring_signature(profiles)
+    # 每个源解析出的全部条目都写入本地全文索引（在主线程写，SQLite连接不跨线程）
+    try:
+        article_index = ArticleIndex()
+    except Exception as e:
+        print(f"[WARN] 打开全文索引失败，本次不更新索引: {e}")
+        article_index = None
+    
+    def fetch_one(item, breaker_mode):
+        i, feed_info = item
+        print(f"[INFO] 📈 处理进度: {i}/{len(rss_feeds)}")
+        if breaker_mode == 'half_open':
+            print(f"[INFO] 🔌 熔断源半开探测（仅尝试一次）: {feed_info.get('title', '')[:30]}")
+            entries = fetch_feed_entries(feed_info, today, rss_status, max_retries=1, throttle=feed_throttle, run_cache=run_cache, scoring_hash=scoring_hash)
+        else:
+            entries = fetch_feed_entries(feed_info, today, rss_status, throttle=feed_throttle, run_cache=run_cache, scoring_hash=scoring_hash)
+        # 每个RSS源只下载解析一次，再分别按各研究组的关键词打分
+        results = {}
+        for profile in profiles:
+            articles, phrases = score_feed_entries(entries, feed_info, today, states[profile.name]['pushed_articles'], profile)
+            results[profile.name] = {'articles': articles, 'phrases': phrases}
+        return entries, results
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=FETCH_WORKERS)
     try:
         print(f"[INFO] 🔄 开始处理 {len(rss_feeds)} 个RSS源...")
-        for i, feed_info in enumerate(rss_feeds, 1):
-            print(f"[INFO] 📈 处理进度: {i}/{len(rss_feeds)}")
-            articles, phrases = filter_articles(feed_info, today, pushed_articles, rss_status)
-            all_articles.extend(articles)
-            all_meaningful_phrases.extend(phrases)
-            if i % 5 == 0:
-                wait_time = random.uniform(1, 2.5)
-                print(f"[INFO] 等待 {wait_time:.1f} 秒...")
-                time.sleep(wait_time)
-            if i % 20 == 0:
-                save_rss_status(rss_status)
-                print(f"[INFO] 已保存当前RSS状态 ({i}/{len(rss_feeds)})")
+        # 按主机分队列派发，某个出版商的源排在前面时其余主机的源不必排队等它
+        pending = [(i, feed_info) for i, feed_info in enumerate(rss_feeds, 1) if feed_info['url'] not in completed_feeds]
+        # 抓取、解析、打分都在线程池中进行，内存变化在主线程对整个循环做一次快照对比
+        with STAGE_PROFILER.memory_snapshot("fetch_parse_score", ("fetch", "parse", "phrases", "score")):
+            # 熔断判断在主线程派发前进行：被跳过的源不占线程、不等主机间隔
+            for (_, feed_info), future in dispatch_by_host(executor, fetch_one, pending, lambda item: item[1]['url'],
+                                                           feed_throttle, FETCH_WORKERS,
+                                                           admit=lambda item: breaker.allow(item[1]['url']),
+                                                           blocked=lambda item: breaker.blocked(item[1]['url'])):
+                entries, results = future.result()
+                breaker.record(feed_info['url'])
+                if article_index is not None and entries:
+                    try:
+                        article_index.add(entries, feed_info, today)
+                    except Exception as e:
+                        print(f"[WARN] 更新全文索引失败: {e}")
+                for name, result in results.items():
+                    states[name]['articles'].extend(result['articles'])
+                    states[name]['phrases'].extend(result['phrases'])
+                try:
+                    fetch_checkpoint.append({
+                        'date': today,
+                        'feed': feed_info['url'],
+                        'status': rss_status.get(feed_info['url']),
+                        'results': results
+                    })
+                except Exception as e:
+                    print(f"[WARN] 写入检查点失败: {e}")
+        fetch_finished = True
         signal.alarm(0)
     except TimeoutError:
-        print("[WARN] RSS源处理超时，使用已处理结果继续")
+        print("[WARN] RSS源处理超时，使用已处理结果继续（检查点已保留，重新运行将从中断处继续）")
     except Exception as e:
         print(f"[ERROR] RSS源处理出错: {str(e)}")
     finally:
         signal.alarm(0)
-        save_rss_status(rss_status)
+        executor.shutdown(wait=False, cancel_futures=True)
+        # 压缩：整体状态原子写入后，检查点日志即可丢弃（超时后仍有请求在途，保存副本）
+        if save_status:
+            save_rss_status(dict(rss_status))
+        if fetch_finished:
+            fetch_checkpoint.clear()
     
-    for article in all_articles:
-        if article['hash'] not in [a['hash'] for a in push_schedule[today]]:
-            push_schedule[today].append(article)
+    if article_index is not None:
+        try:
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=HISTORY_DAYS)).strftime("%Y-%m-%d")
+            pruned = article_index.prune(cutoff)
+            print(f"[INFO] 🗂️ 全文索引: 共{article_index.count()}篇，清理过期{pruned}篇")
+        except Exception as e:
+            print(f"[WARN] 清理全文索引失败: {e}")
+        finally:
+            article_index.close()
     
-    push_schedule[today] = sorted(push_schedule[today], key=lambda x: x['priority_score'], reverse=True)
+    return breaker
+
+def push_all_profiles(profiles, states, rss_summary, today, current_time):
+    senders = []
+    for profile in profiles:
+        if len(profiles) > 1:
+            print(f"\n[INFO] 👥 研究组配置: {profile.name}")
+        with profile_stage("schedule"):
+            selection = select_profile_batches(profile, states[profile.name], today)
+        with profile_stage("push"):
+            senders.append(send_profile_batches(profile, states[profile.name], selection, rss_summary, today, current_time))
+    
+    # 消息在后台按限速发送，这里只在退出前等待队列清空
+    with profile_stage("push"):
+        for sender in senders:
+            sender.close(timeout=600)
+    print(f"[INFO] 📨 微信消息发送: 成功{sum(s.sent for s in senders)}条/失败{sum(s.failed for s in senders)}条")
+    for profile in profiles:
+        label = f"[{profile.name}] " if len(profiles) > 1 else ""
+        print(f"[INFO] 🎉 {label}推送完成! 今日已推送: {len(states[profile.name]['pushed_articles'].get(today, []))}")
+    print(f"[INFO] 📊 RSS源统计: 成功{rss_summary['success']}/失败{rss_summary['failed']}/总计{rss_summary['total']} (成功率{rss_summary['success_rate']}%) 熔断中{rss_summary['breaker_open']}/本次跳过{rss_summary['breaker_skipped']}")
+
+def select_profile_batches(profile, state, today):
+    """对一个研究组执行入队与选择，返回 (第一批, 第二批, 候选日志, 上升趋势短语)"""
+    pushed_articles = state['pushed_articles']
+    push_schedule = state['push_schedule']
+    all_articles = state['articles']
+    all_meaningful_phrases = state['phrases']
     
-    if push_schedule[today]:
+    candidate_log = CandidateLog(profile.candidate_log_file)
+    rising_phrases = []
+    try:
+        trend_store = PhraseTrendStore(profile.trend_file)
+        trend_store.update(today, all_meaningful_phrases)
+        trend_store.save()
+        rising_phrases = trend_store.rising(today)
+    except Exception as e:
+        print(f"[WARN] 更新短语趋势失败: {e}")
+    # 今日队列与新文章一起做近似去重，新闻源晚到的同一成果不会再推一次
+    kept = {article['hash'] for article in remove_near_duplicates(push_schedule[today] + all_articles)}
+    push_queue = PushQueue([article for article in push_schedule[today] if article['hash'] in kept])
+    new_candidates = [article for article in all_articles if article['hash'] in kept and push_queue.push(article)]
+    candidate_log.add(today, new_candidates)
+
+    if len(push_queue):
         print(f"\n[INFO] 🎯 优先级最高的文章:")
-        for i, article in enumerate(push_schedule[today][:5], 1):
+        for i, article in enumerate(push_queue.peek_top(5), 1):
             zone_info = f"[{article['zone']}]" if article['zone'] else "[无分区]"
             print(f"  {i}. {article['title'][:60]}... {zone_info} (分数:{article['priority_score']})")
-    
-    rss_summary = get_rss_status_summary(rss_status, len(rss_feeds))
-    
-    print(f"\n[INFO] 🔄 第四步：准备推送...")
-    first_batch = push_schedule[today][:MAX_PUSH_PER_BATCH]
-    remaining = push_schedule[today][MAX_PUSH_PER_BATCH:]
-    
+
+    first_batch = push_queue.pop_top(MAX_PUSH_PER_BATCH)
+
     if len(first_batch) < MAX_PUSH_PER_BATCH:
         needed_count = MAX_PUSH_PER_BATCH - len(first_batch)
-        historical_articles = find_historical_articles(pushed_articles, push_schedule, today, needed_count)
+        scheduled_hashes = {a['hash'] for a in first_batch} | push_queue.hashes()
+        historical_articles = find_historical_articles(pushed_articles, push_schedule, today, needed_count, scheduled_hashes, candidate_log)
         if historical_articles:
             print(f"[INFO] 📚 从历史文章补充了 {len(historical_articles)} 篇")
             first_batch.extend(historical_articles)
-    
-    second_batch = []
-    if len(remaining) > 0:
-        second_batch = remaining[:MAX_PUSH_PER_BATCH]
-        push_schedule[today] = remaining[MAX_PUSH_PER_BATCH:]
-    else:
-        push_schedule[today] = []
+
+    second_batch = push_queue.pop_top(MAX_PUSH_PER_BATCH)
+    push_schedule[today] = push_queue.to_list()
+    return first_batch, second_batch, candidate_log, rising_phrases
+
+def send_profile_batches(profile, state, selection, rss_summary, today, current_time):
+    """把选出的批次交给消息发送器并记录推送历史，返回发送器（由调用方等待发送完毕）"""
+    pushed_articles = state['pushed_articles']
+    push_schedule = state['push_schedule']
+    all_articles = state['articles']
+    all_meaningful_phrases = state['phrases']
+    first_batch, second_batch, candidate_log, rising_phrases = selection
+    push_sender = WeChatPushSender(webhook=profile.webhook)
     
     if first_batch:
         print(f"[INFO] ✅ 第一批次推送 {len(first_batch)} 篇文章")
         push_content = [format_article_for_push(article, i+1) for i, article in enumerate(first_batch)]
         content = (
-            f"【🏔️ 折叠地层推送】{today} (1/{'2' if second_batch else '1'})\n\n"
+            f"【{profile.title}】{today} (1/{'2' if second_batch else '1'})\n\n"
             f"{chr(10).join(push_content)}\n\n"
             "📊 推送统计:\n"
             f"🎯 第一批次: {len(first_batch)}/{MAX_PUSH_PER_BATCH} 篇\n"
             f"🔍 今日发现: {len(all_articles)} 篇新文章\n"
-            f"🌐 RSS成功率: {rss_summary['success_rate']}% ({rss_summary['success']}/{rss_summary['total']})"
+            f"🌐 RSS成功率: {rss_summary['success_rate']}% ({rss_summary['success']}/{rss_summary['total']})\n"
+            f"⚡ 熔断中: {rss_summary['breaker_open']} 个源，本次跳过 {rss_summary['breaker_skipped']} 个"
         )
         top_phrases = get_top_meaningful_phrases(all_meaningful_phrases, 5)
         if top_phrases:
@@ -1029,24 +3170,24 @@ def main():
                 content += f"\n🏆 {i}. {phrase}: {count}次"
         else:
             content += "\n\n🔥 今日热点短语：\n🚫 暂无明显热点短语"
+        content += format_rising_phrases(rising_phrases)
         content += f"\n\n⏰ 推送时间: {current_time}"
-        push_to_wechat(content)
+        push_to_wechat(content, push_sender)
         
         if today not in pushed_articles:
             pushed_articles[today] = []
         for article in first_batch:
             pushed_articles[today].append(article['hash'])
-        save_pushed_articles(pushed_articles)
-        save_push_schedule(push_schedule)
+        save_pushed_articles(pushed_articles, profile.history_file)
+        candidate_log.mark_pushed(today, [article['hash'] for article in first_batch])
+        save_push_schedule(push_schedule, profile.schedule_file)
         
         if second_batch:
-            print("[INFO] 🕒 等待5秒后推送第二批...")
-            time.sleep(5)
             current_time = datetime.datetime.now().strftime("%H:%M:%S")
             print(f"[INFO] ✅ 第二批次推送 {len(second_batch)} 篇文章")
             push_content = [format_article_for_push(article, i+1) for i, article in enumerate(second_batch)]
             content2 = (
-                f"【🏔️ 折叠地层推送】{today} (2/2)\n\n"
+                f"【{profile.title}】{today} (2/2)\n\n"
                 f"{chr(10).join(push_content)}\n\n"
                 "📊 推送统计:\n"
                 f"🎯 第二批次: {len(second_batch)}/{MAX_PUSH_PER_BATCH} 篇\n"
@@ -1054,18 +3195,20 @@ def main():
                 f"🔍 总计发现: {len(all_articles)} 篇新文章\n\n"
                 f"⏰ 推送时间: {current_time}"
             )
-            push_to_wechat(content2)
+            push_to_wechat(content2, push_sender)
             for article in second_batch:
                 pushed_articles[today].append(article['hash'])
-            save_pushed_articles(pushed_articles)
+            save_pushed_articles(pushed_articles, profile.history_file)
+            candidate_log.mark_pushed(today, [article['hash'] for article in second_batch])
     else:
         print("[INFO] ❌ 今日无新的核心关键词匹配文章")
         content = (
-            f"【🏔️ 折叠地层推送】{today}\n\n"
+            f"【{profile.title}】{today}\n\n"
             "📝 今日无新的核心关键词匹配文章\n"
             f"🔍 已检索 {rss_summary['total']} 个RSS源\n"
             f"✅ 成功获取 {rss_summary['success']} 个源\n"
             f"❌ 失败 {rss_summary['failed']} 个源 (成功率: {rss_summary['success_rate']}%)\n"
+            f"⚡ 熔断中: {rss_summary['breaker_open']} 个源，本次跳过 {rss_summary['breaker_skipped']} 个\n"
             f"💭 全域短语提取: {len(all_meaningful_phrases)} 个"
         )
         top_phrases = get_top_meaningful_phrases(all_meaningful_phrases, 5)
@@ -1075,23 +3218,18 @@ def main():
                 content += f"\n🏆 {i}. {phrase}: {count}次"
         else:
             content += "\n\n🔥 今日热点短语：\n🚫 暂无明显热点短语"
+        content += format_rising_phrases(rising_phrases)
         content += f"\n\n⏰ 推送时间: {current_time}"
-        push_to_wechat(content)
+        push_to_wechat(content, push_sender)
     
-    print(f"[INFO] 🎉 推送完成! 今日已推送: {len(pushed_articles.get(today, []))}")
-    print(f"[INFO] 📊 RSS源统计: 成功{rss_summary['success']}/失败{rss_summary['failed']}/总计{rss_summary['total']} (成功率{rss_summary['success_rate']}%)")
-    
-    backup_file = f"push_schedule_{today}.json"
-    try:
-        with open(backup_file, 'w', encoding='utf-8') as f:
-            json.dump(push_schedule, f, ensure_ascii=False, indent=2)
-        print(f"[INFO] 📦 已创建推送计划备份: {backup_file}")
-    except Exception as e:
-        print(f"[ERROR] 备份推送计划失败: {e}")
+    # 候选日志本身就是逐日追加的增量快照，不再每天写整份推送计划的备份；回补只查最近 BACKFILL_WINDOW_DAYS 天，更早的记录可以丢弃
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=BACKFILL_WINDOW_DAYS)).strftime("%Y-%m-%d")
+    candidate_log.compact(cutoff)
+    return push_sender
 
 if __name__ == "__main__":
     try:
-        main()
+        main(parse_args())
     except Exception as e:
         print(f"[FATAL ERROR] ❌ 主程序执行失败: {e}")
         error_content = (
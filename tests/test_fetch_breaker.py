@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# 熔断与按主机派发：本地替身主机对所有源返回503，主机熔断后其余源应立即跳过，不再等待主机间隔
+import datetime
+import http.server
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sniffer_geo_pro as sniffer
+
+class Always503(http.server.BaseHTTPRequestHandler):
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        Always503.requests_seen.append(self.path)
+        Always503.last_request = time.monotonic()
+        self.send_response(503)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+@pytest.fixture
+def dead_host():
+    Always503.requests_seen = []
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Always503)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+def run_fetch(base, count, rss_status=None):
+    today = datetime.datetime.now().strftime("%Y-%m-%d")
+    feeds = [{"url": f"{base}/dead{i}", "title": f"J{i}", "zone": "", "source": "test"} for i in range(count)]
+    profiles = [sniffer.KeywordProfile()]
+    states = sniffer.load_profile_states(profiles, today)
+    rss_status = {} if rss_status is None else rss_status
+    breaker = sniffer.fetch_and_score(feeds, profiles, states, rss_status, today, save_status=False)
+    # 最后一次请求之后到抓取结束的耗时：被跳过的源不应再等待主机间隔
+    return time.monotonic() - Always503.last_request, breaker, rss_status
+
+def test_tripped_host_skips_remaining_feeds_without_waiting(dead_host, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sniffer, "HOST_INITIAL_INTERVAL", 0.05)
+    tail_time, breaker, rss_status = run_fetch(dead_host, 12)
+    summary = breaker.summary()
+    assert summary['tripped_hosts'] == [dead_host.split("//")[1]]
+    assert summary['skipped'] == 12 - sniffer.HOST_TRIP_MIN_FEEDS
+    # 只有触发熔断的几个源发出过请求，其中每个源的重试次数受限
+    assert len({path for path in Always503.requests_seen}) == sniffer.HOST_TRIP_MIN_FEEDS
+    assert len(Always503.requests_seen) <= sniffer.HOST_TRIP_MIN_FEEDS * 3
+    assert all(rss_status[url]['http_status'] == 503 for url in rss_status)
+    # 熔断时间隔已加倍到数秒，若剩余9个源仍逐个等待间隔，这里会是几十秒
+    assert tail_time < 1
+
+def test_host_tripped_from_history_sends_one_probe(dead_host, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sniffer, "HOST_INITIAL_INTERVAL", 0.05)
+    opened = {'state': 'open', 'failures': 3, 'next_probe': '2099-01-01'}
+    history = {f"{dead_host}/dead{i}": {'status': 'http_error', 'breaker': dict(opened)} for i in range(6)}
+    # 已不在源列表中的旧记录不参与主机级判断
+    history[f"{dead_host}/removed"] = {'status': 'success', 'breaker': {'state': 'closed', 'failures': 0}}
+    _, breaker, _ = run_fetch(dead_host, 6, history)
+    assert len(Always503.requests_seen) == 1
+    assert breaker.summary()['skipped'] == 5
+
+def test_sharded_workers_probe_a_tripped_host_once():
+    opened = {'state': 'open', 'failures': 3, 'next_probe': '2099-01-01'}
+    urls = [f"https://rss.example.org/feed{i}" for i in range(4)]
+    history = {url: {'status': 'timeout', 'breaker': dict(opened)} for url in urls}
+    ring = sniffer.HashRing(3)
+    probes = 0
+    for worker_id in range(3):
+        breaker = sniffer.FeedCircuitBreaker(dict(history), "2026-01-01", urls, lambda url: ring.owner(url) == worker_id)
+        shard = [url for url in urls if ring.owner(url) == worker_id]
+        probes += sum(breaker.allow(url) == 'half_open' for url in shard)
+    assert probes == 1
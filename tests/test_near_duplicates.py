@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+# 近似去重：期刊原文与换了标题、引用摘要的新闻稿应合并；同一期 ScienceDirect 的不同文章摘要格式相近，不应合并
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sniffer_geo_pro as sniffer
+
+JOURNAL_TITLE = "Synchronous termination of the Marinoan glaciation constrained by zircon U-Pb ages from South China and Namibia"
+JOURNAL_SUMMARY = ("<p>Geology, Volume 54, Issue 3, Page 201-205, March 2026.</p><p>The Marinoan glaciation, the younger of two "
+    "Cryogenian snowball Earth events, is thought to have ended abruptly, but the timing of deglaciation in different basins "
+    "has remained poorly constrained. Here we report high-precision CA-ID-TIMS zircon U-Pb ages from volcanic ash beds "
+    "directly beneath and within the basal Ediacaran cap carbonate in South China and Namibia. The ages of 635.2 ± 0.3 Ma "
+    "and 635.0 ± 0.4 Ma are indistinguishable within uncertainty, indicating that deglaciation was globally synchronous "
+    "to within a few hundred thousand years. These results support models in which the termination of the Marinoan "
+    "glaciation was triggered by a runaway greenhouse once atmospheric carbon dioxide reached a critical threshold, "
+    "and they provide a precise tie point for correlating Ediacaran strata worldwide.</p>")
+NEWS_TITLE = "Snowball Earth thawed everywhere at once, volcanic ash reveals"
+NEWS_SUMMARY = ("Geologists dating volcanic ash beds in South China and Namibia found that the end of the Marinoan glaciation "
+    "was globally synchronous to within a few hundred thousand years. The new zircon U-Pb ages from directly beneath and "
+    "within the basal Ediacaran cap carbonate support models in which the termination of the Marinoan glaciation was "
+    "triggered by a runaway greenhouse once atmospheric carbon dioxide reached a critical threshold.")
+
+ISSUE_HEADER = ("<p>Publication date: 1 March 2026</p><p><b>Source:</b> Chemical Geology, Volume 650</p>"
+                "<p>Author(s): {authors}</p>")
+ISSUE_A_TITLE = "Clumped isotope constraints on burial diagenesis of Triassic platform carbonates"
+ISSUE_A_SUMMARY = ISSUE_HEADER.format(authors="Li Wang, Maria Rossi, John Carter") + (
+    "<p>Carbonate clumped isotope thermometry was applied to limestones and dolomites from a Triassic carbonate platform "
+    "in the Dolomites, northern Italy. Dolomite Δ47 temperatures of 60 to 95 °C record recrystallization during burial, "
+    "whereas early marine cements preserve near-surface temperatures. Combined with burial history modelling, the data "
+    "indicate that dolomitization occurred at depths of 1.5 to 2.5 km in the presence of evolved basinal fluids.</p>")
+ISSUE_B_TITLE = "Lithium isotope fractionation during dolomitization of Triassic platform carbonates"
+ISSUE_B_SUMMARY = ISSUE_HEADER.format(authors="Chen Zhou, Peter Müller") + (
+    "<p>Lithium isotope compositions of dolomites and precursor limestones from a Triassic carbonate platform in the "
+    "Dolomites, northern Italy, were measured to test whether δ7Li records the chemistry of dolomitizing fluids. "
+    "Dolomites are systematically depleted in 7Li relative to coeval limestones, and the offset correlates with "
+    "Mg/Ca ratios, indicating fractionation during replacement at elevated temperatures in the presence of basinal fluids.</p>")
+
+def article(title, summary, source, zone_weight=0, score=100):
+    return {'title': title, 'text': title + " " + summary, 'source': source, 'hash': title,
+            'zone_weight': zone_weight, 'priority_score': score}
+
+def test_news_write_up_of_journal_article_is_merged():
+    journal = article(JOURNAL_TITLE, JOURNAL_SUMMARY, "Geology", zone_weight=3)
+    news = article(NEWS_TITLE, NEWS_SUMMARY, "ScienceDaily: Earth Science", score=150)
+    # 整体词对Jaccard只有约0.33，单靠全文相似度会漏掉
+    whole = sniffer._shingles(journal['text']), sniffer._shingles(news['text'])
+    assert len(whole[0] & whole[1]) / len(whole[0] | whole[1]) < sniffer.NEAR_DUPLICATE_THRESHOLD
+    kept = sniffer.remove_near_duplicates([news, journal])
+    assert kept == [journal]
+
+def test_same_issue_articles_are_not_merged():
+    first = article(ISSUE_A_TITLE, ISSUE_A_SUMMARY, "Chemical Geology")
+    second = article(ISSUE_B_TITLE, ISSUE_B_SUMMARY, "Chemical Geology")
+    assert sniffer.remove_near_duplicates([first, second]) == [first, second]
+    # 同一期文章经另一个源（如聚合源）出现时，也只按正文判断
+    second['source'] = "ScienceDirect aggregate"
+    assert sniffer.remove_near_duplicates([first, second]) == [first, second]
+
+def test_same_source_is_never_merged():
+    journal = article(JOURNAL_TITLE, JOURNAL_SUMMARY, "Geology")
+    news = article(NEWS_TITLE, NEWS_SUMMARY, "Geology")
+    assert len(sniffer.remove_near_duplicates([journal, news])) == 2
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+# 短语趋势：追加日志在多次运行（含同一天重跑、跳过的日期）后重新加载，窗口合计应与按天重新累加的结果一致
+import datetime
+import os
+import random
+import sys
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sniffer_geo_pro as sniffer
+
+PHRASES = [f"phrase {i:02d}" for i in range(40)]
+
+def window_totals(days, today, window):
+    cutoff = (datetime.datetime.strptime(today, "%Y-%m-%d") - datetime.timedelta(days=window - 1)).strftime("%Y-%m-%d")
+    totals = Counter()
+    for date, counts in days.items():
+        if cutoff <= date <= today:
+            totals.update(counts)
+    return dict(totals)
+
+def test_reloaded_totals_match_recomputed_windows(tmp_path):
+    path = str(tmp_path / "phrase_trends.jsonl")
+    rng = random.Random(0)
+    expected_days = {}
+    date = datetime.date(2026, 1, 1)
+    for _ in range(70):
+        date += datetime.timedelta(days=rng.choice((1, 1, 1, 2)))
+        today = date.isoformat()
+        for _ in range(rng.choice((1, 1, 2))):
+            phrases = [rng.choice(PHRASES[:25] if date.month == 1 else PHRASES) for _ in range(rng.randrange(0, 60))]
+            store = sniffer.PhraseTrendStore(path)
+            store.update(today, phrases)
+            store.save()
+            expected_days[today] = Counter(phrases)
+        reloaded = sniffer.PhraseTrendStore(path)
+        assert reloaded.windows[sniffer.TREND_RECENT_DAYS] == window_totals(expected_days, today, sniffer.TREND_RECENT_DAYS)
+        assert reloaded.windows[sniffer.TREND_BASELINE_DAYS] == window_totals(expected_days, today, sniffer.TREND_BASELINE_DAYS)
+        assert reloaded.rising(today) == store.rising(today)
+    # 过期的日期会在压缩时丢弃，日志不会无限增长
+    with open(path, encoding="utf-8") as f:
+        assert sum(1 for _ in f) <= 2 * (sniffer.TREND_BASELINE_DAYS + 1)
+
+def test_legacy_json_is_imported(tmp_path):
+    legacy = {'days': {'2026-03-01': {'phrase 01': 2}}, 'recent': {'phrase 01': 2}, 'baseline': {'phrase 01': 2},
+              'recent_start': '2026-02-23', 'baseline_start': '2026-01-31'}
+    sniffer.atomic_write_json(str(tmp_path / "phrase_trends.json"), legacy)
+    store = sniffer.PhraseTrendStore(str(tmp_path / "phrase_trends.jsonl"))
+    store.update('2026-03-02', ['phrase 01'])
+    store.save()
+    reloaded = sniffer.PhraseTrendStore(str(tmp_path / "phrase_trends.jsonl"))
+    assert reloaded.windows[sniffer.TREND_RECENT_DAYS] == {'phrase 01': 3}
+    assert sorted(reloaded.days) == ['2026-03-01', '2026-03-02']
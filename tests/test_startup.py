@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# 冷启动检查：--status 只读本地状态，不应加载网络、解析与只在特定功能中用到的依赖，导入总耗时需在预算内
+import os
+import subprocess
+import sys
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sniffer_geo_pro.py")
+LAZY_MODULES = ("requests", "feedparser", "bs4", "httpx", "sqlite3", "gzip", "pickle", "subprocess")
+IMPORT_BUDGET_SECONDS = 0.5
+
+def run_status_with_importtime(cwd):
+    result = subprocess.run([sys.executable, "-X", "importtime", SCRIPT, "--status"],
+                            cwd=cwd, capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stderr[-2000:]
+    imports = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        imports[name.rstrip()] = int(cumulative)
+    return imports
+
+def test_status_does_not_import_lazy_dependencies(tmp_path):
+    imports = run_status_with_importtime(tmp_path)
+    loaded = sorted(name.strip() for name in imports if name.strip().split(".")[0] in LAZY_MODULES)
+    assert not loaded, f"--status 加载了按需导入的模块: {loaded}"
+
+def test_status_cold_start_within_budget(tmp_path):
+    imports = run_status_with_importtime(tmp_path)
+    # 顶层导入（名字前没有缩进）的累计耗时之和即为整体导入开销
+    total = sum(cumulative for name, cumulative in imports.items() if not name.startswith("  ")) / 1e6
+    assert total < IMPORT_BUDGET_SECONDS, f"冷启动导入耗时 {total:.3f}s 超出预算 {IMPORT_BUDGET_SECONDS}s"
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+# 企业微信推送：本地 http.server 替身作为 webhook，检查按字节切分、文章边界、发送顺序、限速间隔与重试
+import collections
+import http.server
+import json
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sniffer_geo_pro as sniffer
+
+OK = (200, {"errcode": 0, "errmsg": "ok"})
+
+class Webhook(http.server.BaseHTTPRequestHandler):
+    received = []
+    replies = collections.deque()
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        Webhook.received.append((time.monotonic(), payload["text"]["content"]))
+        status, body = Webhook.replies.popleft() if Webhook.replies else OK
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+@pytest.fixture
+def webhook(monkeypatch):
+    Webhook.received = []
+    Webhook.replies = collections.deque()
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Webhook)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/cgi-bin/webhook/send?key=test"
+    monkeypatch.setattr(sniffer, "WECHAT_WEBHOOK", url)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+def make_digest(count):
+    lines = ["【🏔️ 折叠地层推送】2026-10-19", ""]
+    for i in range(1, count + 1):
+        lines += [f"📄 {i}. 碳酸盐岩成岩作用中的黄铁矿氧化与微生物席 Carbonate diagenesis study {i}",
+                  "🏛️ 来源: Chemical Geology [2区]", "📅 日期: 2026-10-18", f"🔗 链接: https://example.org/a/{i}"]
+    return "\n".join(lines)
+
+def test_long_push_is_split_at_article_boundaries_in_order(webhook):
+    text = make_digest(24)
+    sniffer.push_to_wechat(text)
+    contents = [content for _, content in Webhook.received]
+    assert len(contents) >= 3
+    assert all(len(content.encode("utf-8")) <= sniffer.WECHAT_MAX_MESSAGE_BYTES for content in contents)
+    # 每篇文章的四行在同一条消息里，且按原顺序发送
+    for content in contents[1:]:
+        assert content.startswith("📄 ")
+    assert [line for content in contents for line in content.split("\n") if line] == [line for line in text.split("\n") if line]
+    # 每分钟20条：相邻两条至少间隔3秒
+    times = [sent_at for sent_at, _ in Webhook.received]
+    assert all(later - earlier >= 60 / sniffer.WECHAT_RATE_LIMIT_PER_MINUTE - 0.05 for earlier, later in zip(times, times[1:]))
+
+def test_rate_limited_push_is_retried(webhook, monkeypatch):
+    monkeypatch.setattr(sniffer, "WECHAT_RATE_LIMITED_WAIT", 0.1)
+    Webhook.replies.extend([(200, {"errcode": 45009, "errmsg": "api freq out of limit"}), (429, {}), OK])
+    sender = sniffer.WeChatPushSender(rate_per_minute=6000)
+    sender.submit("📄 1. rate limited")
+    sender.close()
+    assert [content for _, content in Webhook.received] == ["📄 1. rate limited"] * 3
+    assert (sender.sent, sender.failed) == (1, 0)
+
+def test_invalid_key_is_not_retried(webhook):
+    Webhook.replies.append((200, {"errcode": 93000, "errmsg": "invalid webhook url"}))
+    sender = sniffer.WeChatPushSender(rate_per_minute=6000)
+    sender.submit("📄 1. bad key")
+    sender.close()
+    assert len(Webhook.received) == 1
+    assert (sender.sent, sender.failed) == (0, 1)